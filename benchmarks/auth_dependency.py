@@ -0,0 +1,73 @@
+"""Time the auth dependency with its caches cold and warm.
+
+    python -m benchmarks.auth_dependency
+
+Calls get_current_user for a throwaway user in DATABASE_URL, each call
+in a fresh session as a request would get, with no caches, with only
+token_cache and with token_cache plus principal_cache kept warm.
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from benchmarks.common import (
+    async_median_ms,
+    database_engine,
+    print_table,
+    seeded_user,
+)
+from fast_zero import security
+from fast_zero.models import User
+
+
+async def run(calls: int, rounds: int):
+    engine = database_engine()
+    rows = []
+
+    async with seeded_user(engine, todos=0) as user_id:
+        async with engine.connect() as conn:
+            email = await conn.scalar(
+                select(User.email).where(User.id == user_id)
+            )
+        token = security.create_access_token({'sub': email})
+
+        for name, cold_caches in (
+            ('no caches', (security.token_cache, security.principal_cache)),
+            ('token_cache', (security.principal_cache,)),
+            ('token_cache + principal_cache', ()),
+        ):
+
+            async def batch(cold_caches=cold_caches):
+                for _ in range(calls):
+                    for cache in cold_caches:
+                        cache.clear()
+                    async with AsyncSession(engine) as session:
+                        await security.get_current_user(session, token)
+
+            await batch()  # warm the pool and whichever caches stay warm
+            ms = await async_median_ms(batch, rounds)
+            rows.append((name, f'{ms * 1000 / calls:.1f}'))
+
+    security.token_cache.clear()
+    security.principal_cache.clear()
+    await engine.dispose()
+    print_table(('caches', 'µs per call'), rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.auth_dependency',
+        description=__doc__.split('\n')[0],
+    )
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    asyncio.run(run(args.calls, args.rounds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Todo insert throughput, one POST per todo versus POST /todos/bulk.
+
+    python -m benchmarks.bulk_insert --todos 5000
+
+Runs the app in process against DATABASE_URL (migrated with
+`alembic upgrade head`), so both paths pay for routing, validation and
+auth the way real clients do; bulk requests carry TODO_BULK_MAX_ITEMS
+todos each.
+"""
+
+import argparse
+from time import perf_counter
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from benchmarks.common import fake_todos, print_table
+from fast_zero.app import app
+from fast_zero.security import create_access_token
+from fast_zero.settings import Settings
+
+
+def run(todos: int):
+    batch_size = Settings().TODO_BULK_MAX_ITEMS
+    payload = list(fake_todos(todos))
+    name = f'benchmark-{uuid4().hex[:12]}'
+    email = f'{name}@example.com'
+    timings = {}
+
+    with TestClient(app) as client:
+        response = client.post(
+            '/users/',
+            json={'username': name, 'email': email, 'password': uuid4().hex},
+        )
+        response.raise_for_status()
+        user_id = response.json()['id']
+        token = create_access_token({'sub': email})
+        headers = {'Authorization': f'Bearer {token}'}
+
+        try:
+            start = perf_counter()
+            for todo in payload:
+                client.post(
+                    '/todos/', headers=headers, json=todo
+                ).raise_for_status()
+            timings['POST /todos/'] = perf_counter() - start
+
+            start = perf_counter()
+            for offset in range(0, todos, batch_size):
+                client.post(
+                    '/todos/bulk',
+                    headers=headers,
+                    json={'todos': payload[offset : offset + batch_size]},
+                ).raise_for_status()
+            timings['POST /todos/bulk'] = perf_counter() - start
+        finally:
+            client.delete(f'/users/{user_id}', headers=headers)
+
+    print_table(
+        ('endpoint', 'seconds', 'todos/s'),
+        [
+            (endpoint, f'{seconds:.2f}', f'{todos / seconds:.0f}')
+            for endpoint, seconds in timings.items()
+        ],
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.bulk_insert',
+        description=__doc__.split('\n')[0],
+    )
+    parser.add_argument('--todos', type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    run(args.todos)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Helpers shared by the benchmark scripts."""
+
+import random
+from contextlib import asynccontextmanager
+from datetime import datetime
+from statistics import median
+from time import perf_counter
+from types import SimpleNamespace
+from uuid import uuid4
+
+from sqlalchemy import delete, insert
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from fast_zero.database import engine_options
+from fast_zero.models import Todo, TodoState, TodoTombstone, User
+from fast_zero.settings import Settings
+
+WORDS = (
+    'buy milk call mom fix bug write report book flight pay rent water '
+    'plants clean kitchen review pull request renew passport walk dog '
+    'plan trip update budget read chapter cancel subscription'
+).split()
+SEED_BATCH = 10_000
+
+
+def median_ms(func, rounds: int) -> float:
+    timings = []
+
+    for _ in range(rounds):
+        start = perf_counter()
+        func()
+        timings.append((perf_counter() - start) * 1000)
+
+    return median(timings)
+
+
+async def async_median_ms(func, rounds: int) -> float:
+    timings = []
+
+    for _ in range(rounds):
+        start = perf_counter()
+        await func()
+        timings.append((perf_counter() - start) * 1000)
+
+    return median(timings)
+
+
+def print_table(headers, rows):
+    widths = [
+        max(len(str(value)) for value in column)
+        for column in zip(headers, *rows)
+    ]
+
+    for row in (headers, *rows):
+        print('  '.join(str(v).rjust(w) for v, w in zip(row, widths)))
+
+
+def fake_todos(count: int, seed: int = 0):
+    """Synthetic todo dicts with a few words each in title/description."""
+    rng = random.Random(seed)
+    states = [state.value for state in TodoState]
+
+    for _ in range(count):
+        yield {
+            'title': ' '.join(rng.choices(WORDS, k=3)),
+            'description': ' '.join(rng.choices(WORDS, k=12)),
+            'state': rng.choice(states),
+        }
+
+
+def fake_page(size: int) -> dict:
+    """TodoList content whose rows look like the ones list_todos fetches."""
+    now = datetime(2025, 1, 1)
+    todos = [
+        SimpleNamespace(id=i, created_at=now, updated_at=now, **todo)
+        for i, todo in enumerate(fake_todos(size), start=1)
+    ]
+    return {'todos': todos, 'next_cursor': None}
+
+
+def database_engine():
+    """Engine for DATABASE_URL, configured like the app's own."""
+    settings = Settings()
+    return create_async_engine(
+        settings.DATABASE_URL, **engine_options(settings)
+    )
+
+
+@asynccontextmanager
+async def seeded_user(engine, todos: int):
+    """A throwaway user owning `todos` synthetic todos, removed on exit.
+
+    The schema must exist already (`alembic upgrade head`), so the
+    indexes being measured are the ones the migrations create.
+    """
+    name = f'benchmark-{uuid4().hex[:12]}'
+
+    async with engine.begin() as conn:
+        user_id = await conn.scalar(
+            insert(User)
+            .values(username=name, email=f'{name}@example.com', password='!')
+            .returning(User.id)
+        )
+        rows = fake_todos(todos)
+
+        for start in range(0, todos, SEED_BATCH):
+            batch = [
+                {**next(rows), 'user_id': user_id}
+                for _ in range(min(SEED_BATCH, todos - start))
+            ]
+            await conn.execute(insert(Todo), batch)
+
+    try:
+        yield user_id
+    finally:
+        async with engine.begin() as conn:
+            for model in (TodoTombstone, Todo):
+                await conn.execute(
+                    delete(model).where(model.user_id == user_id)
+                )
+            await conn.execute(delete(User).where(User.id == user_id))
@@ -0,0 +1,56 @@
+"""CPU time versus bytes saved for each response encoding and level.
+
+    python -m benchmarks.compression --items 1000
+
+Compresses one /todos/ page body with every encoder the middleware can
+offer (brotli and zstandard only when installed) at a few levels, the
+way it sends a non-streaming body. No database is needed.
+"""
+
+import argparse
+
+from benchmarks.common import fake_page, median_ms, print_table
+from fast_zero.compression import ENCODERS
+from fast_zero.responses import ModelResponse
+from fast_zero.schemas import TodoList
+
+LEVELS = {'br': (1, 4, 9, 11), 'zstd': (1, 3, 9, 19), 'gzip': (1, 6, 9)}
+
+
+def run(items: int, rounds: int):
+    body = ModelResponse(TodoList, fake_page(items)).body
+    rows = [('identity', '-', f'{len(body) / 1024:.1f}', '1.00', '0.00')]
+
+    for encoding, encoder in ENCODERS.items():
+        for level in LEVELS[encoding]:
+
+            def compress(encoder=encoder, level=level):
+                compressor = encoder(level)
+                return compressor.compress(body) + compressor.finish()
+
+            size = len(compress())
+            rows.append((
+                encoding,
+                level,
+                f'{size / 1024:.1f}',
+                f'{size / len(body):.2f}',
+                f'{median_ms(compress, rounds):.2f}',
+            ))
+
+    print_table(('encoding', 'level', 'KiB', 'ratio', 'ms'), rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.compression',
+        description=__doc__.split('\n')[0],
+    )
+    parser.add_argument('--items', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    run(args.items, args.rounds)
+
+
+if __name__ == '__main__':
+    main()
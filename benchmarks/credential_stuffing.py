@@ -0,0 +1,125 @@
+"""Argon2 CPU spent on bad-password logins, with the limiter on and off.
+
+    python -m benchmarks.credential_stuffing --attempts 200
+
+Runs the app in process against DATABASE_URL (migrated with
+`alembic upgrade head`), creates one account and fires `--attempts`
+wrong passwords at it from one client, first through the configured
+LOGIN_* limits and then with limits too high to ever trigger. CPU is the
+whole process's: Argon2 runs its lanes on native threads of its own, so
+the time of the calling thread alone would undercount it.
+"""
+
+import argparse
+from collections import Counter
+from threading import Lock
+from time import perf_counter, process_time
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from benchmarks.common import print_table
+from fast_zero import security
+from fast_zero.app import app
+from fast_zero.ratelimit import LoginLimiter, MemoryBackend
+from fast_zero.routers import auth
+
+
+class CountingVerify:
+    """Wraps verify_and_update_password to count the hashes computed."""
+
+    def __init__(self, verify):
+        self.verify = verify
+        self.calls = 0
+        self._lock = Lock()
+
+    def __call__(self, *args):
+        with self._lock:
+            self.calls += 1
+        return self.verify(*args)
+
+
+def _attack(client, email: str, attempts: int, limiter) -> tuple:
+    verify = CountingVerify(security.verify_and_update_password)
+    previous = auth.login_limiter, security.verify_and_update_password
+    auth.login_limiter = limiter
+    security.verify_and_update_password = verify
+    statuses = Counter()
+
+    try:
+        cpu_start, wall_start = process_time(), perf_counter()
+        for _ in range(attempts):
+            response = client.post(
+                '/auth/token',
+                data={'username': email, 'password': uuid4().hex},
+            )
+            statuses[response.status_code] += 1
+        cpu_seconds = process_time() - cpu_start
+        wall_seconds = perf_counter() - wall_start
+    finally:
+        auth.login_limiter, security.verify_and_update_password = previous
+
+    return statuses, verify.calls, cpu_seconds, wall_seconds
+
+
+def run(attempts: int):
+    name = f'benchmark-{uuid4().hex[:12]}'
+    email = f'{name}@example.com'
+    unlimited = LoginLimiter(
+        MemoryBackend(maxsize=1),
+        ip_burst=attempts,
+        ip_per_minute=attempts,
+        username_burst=attempts,
+        username_per_minute=attempts,
+    )
+    rows = []
+
+    with TestClient(app) as client:
+        response = client.post(
+            '/users/',
+            json={'username': name, 'email': email, 'password': uuid4().hex},
+        )
+        response.raise_for_status()
+        user_id = response.json()['id']
+
+        try:
+            for label, limiter in (
+                ('on', security.login_limiter),
+                ('off', unlimited),
+            ):
+                limiter.reset()
+                statuses, hashes, cpu_seconds, wall_seconds = _attack(
+                    client, email, attempts, limiter
+                )
+                rows.append((
+                    label,
+                    statuses[401],
+                    statuses[429],
+                    hashes,
+                    f'{cpu_seconds:.2f}',
+                    f'{wall_seconds:.2f}',
+                ))
+        finally:
+            security.login_limiter.reset()
+            token = security.create_access_token({'sub': email})
+            client.delete(
+                f'/users/{user_id}',
+                headers={'Authorization': f'Bearer {token}'},
+            )
+
+    print_table(('limiter', '401', '429', 'hashes', 'cpu s', 'wall s'), rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.credential_stuffing',
+        description=__doc__.split('\n')[0],
+    )
+    parser.add_argument('--attempts', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    run(args.attempts)
+
+
+if __name__ == '__main__':
+    main()
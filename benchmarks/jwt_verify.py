@@ -0,0 +1,102 @@
+"""Token verification cost per algorithm, with and without token_cache.
+
+    python -m benchmarks.jwt_verify
+
+Signs a token with HS256 (SECRET_KEY) and with RS256 and EdDSA keys from a
+generated JWKS file, then times decode_token with an empty token_cache,
+so the signature is checked on every call, and with the token cached.
+No database is needed.
+"""
+
+import argparse
+import json
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+from benchmarks.common import median_ms, print_table
+from fast_zero import security
+from fast_zero.keys import KeySet
+
+ALGORITHMS = ('HS256', 'RS256', 'EdDSA')
+
+
+def _private_jwk(algorithm: str) -> dict:
+    if algorithm == 'EdDSA':
+        key = ed25519.Ed25519PrivateKey.generate()
+        jwk = OKPAlgorithm.to_jwk(key, as_dict=True)
+    else:
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        jwk = RSAAlgorithm.to_jwk(key, as_dict=True)
+    return {**jwk, 'kid': f'benchmark-{algorithm}'}
+
+
+@contextmanager
+def signing_with(algorithm: str, directory: Path):
+    """Point security at a key for `algorithm`, restoring it afterwards."""
+    previous = security.key_set, security.settings.ALGORITHM
+    key_set = None
+
+    if algorithm != 'HS256':
+        path = directory / f'{algorithm}.json'
+        path.write_text(json.dumps({'keys': [_private_jwk(algorithm)]}))
+        key_set = KeySet(path)
+
+    security.key_set = key_set
+    security.settings.ALGORITHM = 'HS256'
+    try:
+        yield
+    finally:
+        security.key_set, security.settings.ALGORITHM = previous
+        security.token_cache.clear()
+
+
+def per_call_us(func, calls: int, rounds: int) -> float:
+    def batch():
+        for _ in range(calls):
+            func()
+
+    return median_ms(batch, rounds) * 1000 / calls
+
+
+def run(calls: int, rounds: int):
+    rows = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        for algorithm in ALGORITHMS:
+            with signing_with(algorithm, Path(directory)):
+                token = security.create_access_token({'sub': 'benchmark'})
+
+                def uncached(token=token):
+                    security.token_cache.clear()
+                    security.decode_token(token)
+
+                def cached(token=token):
+                    security.decode_token(token)
+
+                rows.append((
+                    algorithm,
+                    f'{per_call_us(uncached, calls, rounds):.1f}',
+                    f'{per_call_us(cached, calls, rounds):.1f}',
+                ))
+
+    print_table(('algorithm', 'verify µs', 'cached µs'), rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.jwt_verify',
+        description=__doc__.split('\n')[0],
+    )
+    parser.add_argument('--calls', type=int, default=1000)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    run(args.calls, args.rounds)
+
+
+if __name__ == '__main__':
+    main()
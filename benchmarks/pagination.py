@@ -0,0 +1,86 @@
+"""Time /todos/ pages by depth, offset versus cursor pagination.
+
+    python -m benchmarks.pagination --todos 1000000 --limit 100
+
+Seeds one user with synthetic todos in DATABASE_URL (migrated with
+`alembic upgrade head`) and times the list query at pages 1 to 10,000.
+Offset pages get slower with depth; cursor pages should stay flat.
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import select
+
+from benchmarks.common import (
+    async_median_ms,
+    database_engine,
+    print_table,
+    seeded_user,
+)
+from fast_zero.models import Todo
+from fast_zero.pagination import encode_cursor, paginate
+from fast_zero.routers.todos import TODO_PUBLIC_COLUMNS
+from fast_zero.schemas import FilterTodo
+
+PAGES = (1, 10, 100, 1000, 10_000)
+
+
+async def run(todos: int, limit: int, rounds: int):
+    engine = database_engine()
+    rows = []
+
+    async with seeded_user(engine, todos) as user_id, engine.connect() as conn:
+        query = select(*TODO_PUBLIC_COLUMNS).where(Todo.user_id == user_id)
+
+        async def fetch(page):
+            result = await conn.execute(paginate(query, page, Todo.id))
+            return result.all()
+
+        for page_number in PAGES:
+            skipped = (page_number - 1) * limit
+
+            if skipped >= todos:
+                break
+
+            last_id = 0
+            if skipped:
+                last_id = await conn.scalar(
+                    select(Todo.id)
+                    .where(Todo.user_id == user_id)
+                    .order_by(Todo.id)
+                    .offset(skipped - 1)
+                    .limit(1)
+                )
+            offset_page = FilterTodo(offset=skipped, limit=limit)
+            cursor_page = FilterTodo(
+                cursor=encode_cursor(last_id), limit=limit
+            )
+
+            offset_ms = await async_median_ms(
+                lambda: fetch(offset_page), rounds
+            )
+            cursor_ms = await async_median_ms(
+                lambda: fetch(cursor_page), rounds
+            )
+            rows.append((page_number, f'{offset_ms:.2f}', f'{cursor_ms:.2f}'))
+
+    await engine.dispose()
+    print_table(('page', 'offset ms', 'cursor ms'), rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.pagination',
+        description=__doc__.split('\n')[0],
+    )
+    parser.add_argument('--todos', type=int, default=1_000_000)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    asyncio.run(run(args.todos, args.limit, args.rounds))
+
+
+if __name__ == '__main__':
+    main()
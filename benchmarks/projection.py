@@ -0,0 +1,95 @@
+"""Time and memory of loading entities versus response columns.
+
+    python -m benchmarks.projection --todos 1000 --limit 100
+
+Seeds one user with synthetic todos in DATABASE_URL and loads what the
+read endpoints need, once as full ORM entities and once as the column
+projections they now use. Memory is the peak traced by tracemalloc while
+one request's rows are loaded; loading the user entity also pulls every
+todo through its selectin relationship.
+"""
+
+import argparse
+import asyncio
+import tracemalloc
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from benchmarks.common import (
+    async_median_ms,
+    database_engine,
+    print_table,
+    seeded_user,
+)
+from fast_zero.models import Todo, User
+from fast_zero.routers.todos import TODO_PUBLIC_COLUMNS
+from fast_zero.routers.users import USER_PUBLIC_COLUMNS
+
+
+def _statements(user_id: int, limit: int):
+    def todos_page(*columns):
+        return (
+            select(*columns)
+            .where(Todo.user_id == user_id)
+            .order_by(Todo.id)
+            .limit(limit)
+        )
+
+    def one_user(*columns):
+        return select(*columns).where(User.id == user_id)
+
+    return {
+        'todos page, entities': todos_page(Todo),
+        'todos page, columns': todos_page(*TODO_PUBLIC_COLUMNS),
+        'one user, entity': one_user(User),
+        'one user, columns': one_user(*USER_PUBLIC_COLUMNS),
+    }
+
+
+async def _peak_kib(func) -> float:
+    tracemalloc.start()
+    try:
+        await func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+async def run(todos: int, limit: int, rounds: int):
+    engine = database_engine()
+    rows = []
+
+    async with seeded_user(engine, todos) as user_id:
+        for name, statement in _statements(user_id, limit).items():
+
+            async def load(statement=statement):
+                # A fresh session per request, as get_session gives
+                async with AsyncSession(engine) as session:
+                    result = await session.execute(statement)
+                    return result.all()
+
+            await load()  # warm the statement cache and the pool
+            ms = await async_median_ms(load, rounds)
+            rows.append((name, f'{ms:.2f}', f'{await _peak_kib(load):.0f}'))
+
+    await engine.dispose()
+    print_table(('load', 'ms', 'peak KiB'), rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.projection',
+        description=__doc__.split('\n')[0],
+    )
+    parser.add_argument('--todos', type=int, default=1000)
+    parser.add_argument('--limit', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    asyncio.run(run(args.todos, args.limit, args.rounds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""Time todo title/description searches for each TODO_SEARCH_BACKEND.
+
+    python -m benchmarks.search --todos 1000000
+
+Seeds one user with synthetic todos in DATABASE_URL and times the first
+/todos/ page for a few search terms. Migrate with `alembic upgrade head`
+first: the pg_trgm/tsvector indexes (Postgres) and the FTS5 table
+(SQLite) come from the migrations.
+"""
+
+import argparse
+import asyncio
+
+from sqlalchemy import select
+
+from benchmarks.common import (
+    async_median_ms,
+    database_engine,
+    print_table,
+    seeded_user,
+)
+from fast_zero.models import Todo
+from fast_zero.pagination import paginate
+from fast_zero.routers.todos import TODO_PUBLIC_COLUMNS
+from fast_zero.schemas import FilterTodo
+from fast_zero.search import text_match
+
+BACKENDS = ('like', 'fulltext')
+# Terms in roughly 10% and 30% of rows and in none: the index plans differ
+TERMS = (('title', 'milk'), ('description', 'passport'), ('title', 'zebra'))
+
+
+async def run(todos: int, rounds: int):
+    engine = database_engine()
+    dialect = engine.dialect.name
+    rows = []
+
+    async with seeded_user(engine, todos) as user_id, engine.connect() as conn:
+
+        async def search(column, term, backend):
+            query = select(*TODO_PUBLIC_COLUMNS).where(
+                Todo.user_id == user_id,
+                text_match(column, term, backend=backend, dialect=dialect),
+            )
+            result = await conn.execute(paginate(query, FilterTodo(), Todo.id))
+            return result.all()
+
+        for name, term in TERMS:
+            column = getattr(Todo, name)
+            timings = [
+                await async_median_ms(
+                    lambda: search(column, term, backend), rounds
+                )
+                for backend in BACKENDS
+            ]
+            rows.append((
+                f'{name}={term}',
+                *(f'{timing:.2f}' for timing in timings),
+            ))
+
+    await engine.dispose()
+    print_table(('search', *(f'{name} ms' for name in BACKENDS)), rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.search',
+        description=__doc__.split('\n')[0],
+    )
+    parser.add_argument('--todos', type=int, default=1_000_000)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    asyncio.run(run(args.todos, args.rounds))
+
+
+if __name__ == '__main__':
+    main()
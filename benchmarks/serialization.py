@@ -0,0 +1,70 @@
+"""Serialize /todos/ pages with ModelResponse versus response_model.
+
+    python -m benchmarks.serialization
+
+Times both ways of turning a page of rows into JSON bytes for 100, 1k and
+10k items: FastAPI's own response_model pass (validate, serialize, then
+json.dumps) and ModelResponse (one validation, dumped by pydantic-core).
+No database is needed.
+"""
+
+import argparse
+import asyncio
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from benchmarks.common import async_median_ms, fake_page, print_table
+from fast_zero.responses import ModelResponse
+from fast_zero.schemas import TodoList
+
+PAGE_SIZES = (100, 1000, 10_000)
+
+
+async def run(rounds: int):
+    field = create_model_field('Response_list_todos', TodoList)
+    rows = []
+
+    async def response_model(content):
+        body = await serialize_response(field=field, response_content=content)
+        return JSONResponse(body).body
+
+    async def model_response(content):
+        return ModelResponse(TodoList, content).body
+
+    for size in PAGE_SIZES:
+        content = fake_page(size)
+        # Both must send the same bytes for the comparison to mean anything
+        assert await response_model(content) == await model_response(content)
+        default_ms = await async_median_ms(
+            lambda: response_model(content), rounds
+        )
+        fast_ms = await async_median_ms(
+            lambda: model_response(content), rounds
+        )
+        rows.append((
+            size,
+            f'{default_ms:.2f}',
+            f'{fast_ms:.2f}',
+            f'{default_ms / fast_ms:.1f}x',
+        ))
+
+    print_table(
+        ('items', 'response_model ms', 'ModelResponse ms', 'speedup'), rows
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks.serialization',
+        description=__doc__.split('\n')[0],
+    )
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    asyncio.run(run(args.rounds))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,41 @@
+from contextlib import asynccontextmanager
 from http import HTTPStatus
 
 from fastapi import FastAPI
 
+from fast_zero.compression import CompressionMiddleware
+from fast_zero.instrumentation import InstrumentationMiddleware
+from fast_zero.metrics import (
+    MetricsMiddleware,
+    mark_process_dead,
+    metrics_response,
+)
 from fast_zero.routers import auth, todos, users
 from fast_zero.schemas import Message
+from fast_zero.settings import Settings
 
-app = FastAPI()
+settings = Settings()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    mark_process_dead()
+
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    levels={
+        'gzip': settings.COMPRESSION_GZIP_LEVEL,
+        'br': settings.COMPRESSION_BROTLI_QUALITY,
+        'zstd': settings.COMPRESSION_ZSTD_LEVEL,
+    },
+)
+# Added last so it wraps compression and times the whole response
+app.add_middleware(InstrumentationMiddleware)
+app.add_middleware(MetricsMiddleware)
 app.include_router(users.router)
 app.include_router(auth.router)
 app.include_router(todos.router)
@@ -14,3 +44,8 @@ app.include_router(todos.router)
 @app.get('/', status_code=HTTPStatus.OK, response_model=Message)
 async def read_root():
     return {'message': 'Olá mundo!'}
+
+
+@app.get('/metrics', include_in_schema=False)
+def read_metrics():
+    return metrics_response()
@@ -0,0 +1,56 @@
+from collections import OrderedDict
+from time import monotonic
+
+
+class TTLCache:
+    """Bounded in-process LRU cache whose entries expire after a TTL."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # Bumped by invalidate(); see set(epoch=...)
+        self.epoch = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        entry = self._data.get(key)
+
+        if entry is None or entry[1] <= monotonic():
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key, value, ttl: float | None = None, epoch=None):
+        """Store `value`; skipped if anything was invalidated since `epoch`.
+
+        Readers pass the epoch taken before loading `value`, so a value read
+        before a write committed is not cached after its invalidation.
+        """
+        if self.maxsize <= 0 or (epoch is not None and epoch != self.epoch):
+            return
+
+        expires_at = monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        self.epoch += 1
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
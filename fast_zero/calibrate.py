@@ -0,0 +1,93 @@
+"""Suggest Argon2 parameters for this host.
+
+    python -m fast_zero.calibrate --target-ms 50
+
+Memory is halved while a single pass is already too slow, then passes are
+added until hashing takes about the target; paste the printed lines into
+`.env`. Run it on the production hardware, with nothing else busy.
+"""
+
+import argparse
+from statistics import median
+from time import perf_counter
+
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+# Below this the memory cost stops being a meaningful GPU/ASIC defence
+MIN_MEMORY_COST = 8192
+MAX_TIME_COST = 20
+
+
+def measure_ms(hasher: Argon2Hasher, rounds: int) -> float:
+    timings = []
+
+    for _ in range(rounds):
+        start = perf_counter()
+        hasher.hash('calibration-password')
+        timings.append((perf_counter() - start) * 1000)
+
+    return median(timings)
+
+
+def calibrate(
+    target_ms: float,
+    memory_cost: int = 65536,
+    parallelism: int = 4,
+    rounds: int = 5,
+) -> dict:
+    def measure(time_cost, memory_cost):
+        hasher = Argon2Hasher(
+            time_cost=time_cost,
+            memory_cost=memory_cost,
+            parallelism=parallelism,
+        )
+        return measure_ms(hasher, rounds)
+
+    time_cost = 1
+    elapsed = measure(time_cost, memory_cost)
+
+    while elapsed > target_ms and memory_cost // 2 >= MIN_MEMORY_COST:
+        memory_cost //= 2
+        elapsed = measure(time_cost, memory_cost)
+
+    while elapsed < target_ms and time_cost < MAX_TIME_COST:
+        next_elapsed = measure(time_cost + 1, memory_cost)
+        if abs(next_elapsed - target_ms) > target_ms - elapsed:
+            break
+        time_cost += 1
+        elapsed = next_elapsed
+
+    return {
+        'ARGON2_TIME_COST': time_cost,
+        'ARGON2_MEMORY_COST': memory_cost,
+        'ARGON2_PARALLELISM': parallelism,
+        'elapsed_ms': elapsed,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m fast_zero.calibrate',
+        description=__doc__.split('\n')[0],
+    )
+    parser.add_argument('--target-ms', type=float, default=50)
+    parser.add_argument('--memory-cost', type=int, default=65536)
+    parser.add_argument('--parallelism', type=int, default=4)
+    parser.add_argument('--rounds', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    result = calibrate(
+        args.target_ms,
+        memory_cost=args.memory_cost,
+        parallelism=args.parallelism,
+        rounds=args.rounds,
+    )
+    elapsed_ms = result.pop('elapsed_ms')
+
+    print(f'# {elapsed_ms:.1f} ms per hash (target {args.target_ms:g} ms)')
+    for name, value in result.items():
+        print(f'{name}={value}')
+
+
+if __name__ == '__main__':
+    main()
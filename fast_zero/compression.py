@@ -0,0 +1,189 @@
+import zlib
+from http import HTTPStatus
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+
+class GzipEncoder:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+# Preferred first; only encoders whose library is installed are offered
+ENCODERS = {
+    name: encoder
+    for name, encoder, module in (
+        ('br', BrotliEncoder, brotli),
+        ('zstd', ZstdEncoder, zstandard),
+        ('gzip', GzipEncoder, zlib),
+    )
+    if module is not None
+}
+
+
+def skip_compression(endpoint):
+    """Mark a route endpoint whose responses must be sent uncompressed."""
+    endpoint.skip_compression = True
+    return endpoint
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    accepted = {}
+
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    for name in ENCODERS:
+        if accepted.get(name, accepted.get('*', 0)) > 0:
+            return name
+
+    return None
+
+
+class CompressionMiddleware:
+    """Compress responses with the best encoding the client accepts.
+
+    Bodies smaller than `minimum_size` are sent as-is; streaming bodies
+    are compressed chunk by chunk and flushed so clients see each chunk.
+    """
+
+    def __init__(self, app, minimum_size: int = 500, levels=None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {'br': 4, 'zstd': 3, 'gzip': 6, **(levels or {})}
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(
+            Headers(scope=scope).get('accept-encoding', '')
+        )
+
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, scope, send, encoding)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware, scope, send, encoding):
+        self.middleware = middleware
+        self.scope = scope
+        self.downstream = send
+        self.encoding = encoding
+        self.start_message = None
+        self.encoder = None
+        self.passthrough = False
+
+    def _skip(self, headers):
+        endpoint = self.scope.get('endpoint')
+        status = self.start_message['status']
+        return (
+            'content-encoding' in headers
+            or status < HTTPStatus.OK
+            or status in {HTTPStatus.NO_CONTENT, HTTPStatus.NOT_MODIFIED}
+            or getattr(endpoint, 'skip_compression', False)
+        )
+
+    async def send(self, message):
+        if message['type'] == 'http.response.start':
+            self.start_message = message
+            return
+
+        if message['type'] != 'http.response.body':
+            await self.downstream(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+
+        if self.encoder is None and not self.passthrough:
+            headers = MutableHeaders(raw=self.start_message['headers'])
+
+            if self._skip(headers) or (
+                not more_body and len(body) < self.middleware.minimum_size
+            ):
+                self.passthrough = True
+                await self.downstream(self.start_message)
+            else:
+                self.encoder = ENCODERS[self.encoding](
+                    self.middleware.levels[self.encoding]
+                )
+                headers['Content-Encoding'] = self.encoding
+                headers.add_vary_header('Accept-Encoding')
+                del headers['Content-Length']
+
+                if not more_body:
+                    body = self.encoder.compress(body) + self.encoder.finish()
+                    headers['Content-Length'] = str(len(body))
+                    await self.downstream(self.start_message)
+                    await self.downstream({**message, 'body': body})
+                    return
+
+                await self.downstream(self.start_message)
+
+        if self.passthrough:
+            await self.downstream(message)
+            return
+
+        body = self.encoder.compress(body)
+        body += self.encoder.flush() if more_body else self.encoder.finish()
+        await self.downstream({**message, 'body': body})
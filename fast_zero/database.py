@@ -1,8 +1,87 @@
+from time import perf_counter
+
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 
+from fast_zero.instrumentation import SQLTimer
+from fast_zero.metrics import (
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUTS,
+    DB_POOL_OVERFLOW,
+    DB_POOL_WAIT,
+)
 from fast_zero.settings import Settings
 
-engine = create_async_engine(Settings().DATABASE_URL)
+
+def _on_checkout(*args):
+    DB_POOL_CHECKOUTS.inc()
+    DB_POOL_CHECKED_OUT.inc()
+
+
+def _on_checkin(*args):
+    DB_POOL_CHECKED_OUT.dec()
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited.
+
+    Opening a new connection is not waiting for the pool, so that time is
+    left out; saturation shows up as wait time and `db_pool_overflow`.
+    """
+
+    def _create_connection(self):
+        start = perf_counter()
+        record = super()._create_connection()
+        record.info['connect_seconds'] = perf_counter() - start
+        return record
+
+    def _do_get(self):
+        start = perf_counter()
+        connect_seconds = 0.0
+        try:
+            record = super()._do_get()
+            connect_seconds = record.info.pop('connect_seconds', 0.0)
+            return record
+        finally:
+            DB_POOL_WAIT.observe(perf_counter() - start - connect_seconds)
+            DB_POOL_OVERFLOW.set(max(self.overflow(), 0))
+
+    def _do_return_conn(self, record):
+        try:
+            super()._do_return_conn(record)
+        finally:
+            DB_POOL_OVERFLOW.set(max(self.overflow(), 0))
+
+
+def engine_options(settings: Settings):
+    options = {'pool_pre_ping': settings.DATABASE_POOL_PRE_PING}
+
+    if settings.DATABASE_NULL_POOL:
+        options['poolclass'] = NullPool
+    elif not settings.DATABASE_URL.startswith('sqlite'):
+        options.update(
+            poolclass=TimedQueuePool,
+            pool_size=settings.DATABASE_POOL_SIZE,
+            max_overflow=settings.DATABASE_MAX_OVERFLOW,
+            pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+            pool_recycle=settings.DATABASE_POOL_RECYCLE,
+        )
+
+    return options
+
+
+settings = Settings()
+engine = create_async_engine(settings.DATABASE_URL, **engine_options(settings))
+event.listen(engine.sync_engine, 'checkout', _on_checkout)
+event.listen(engine.sync_engine, 'checkin', _on_checkin)
+
+sql_timer = SQLTimer(
+    slow_query_ms=settings.SLOW_QUERY_THRESHOLD_MS
+    if settings.SLOW_QUERY_LOG
+    else None
+)
+sql_timer.install(engine.sync_engine)
 
 
 async def get_session():
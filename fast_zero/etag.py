@@ -0,0 +1,35 @@
+from hashlib import sha1
+from http import HTTPStatus
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts) -> str:
+    """Weak ETag for a representation derived from the given parts."""
+    digest = sha1(
+        '|'.join(str(part) for part in parts).encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get('if-none-match')
+
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == '*':
+        return True
+
+    opaque_tag = etag.removeprefix('W/')
+    return any(
+        candidate.strip().removeprefix('W/') == opaque_tag
+        for candidate in if_none_match.split(',')
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=HTTPStatus.NOT_MODIFIED, headers={'ETag': etag}
+    )
@@ -0,0 +1,142 @@
+import csv
+from collections import deque
+from io import StringIO
+
+from pydantic import ValidationError
+
+from fast_zero.schemas import TodoPublic, TodoSchema
+
+MEDIA_TYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+TODO_FIELDS = list(TodoPublic.model_fields)
+
+
+def _dump(row):
+    return TodoPublic.model_validate(row, from_attributes=True)
+
+
+def ndjson_chunk(rows) -> str:
+    return ''.join(f'{_dump(row).model_dump_json()}\n' for row in rows)
+
+
+def csv_header() -> str:
+    buffer = StringIO()
+    csv.writer(buffer).writerow(TODO_FIELDS)
+    return buffer.getvalue()
+
+
+def csv_chunk(rows) -> str:
+    buffer = StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=TODO_FIELDS)
+    writer.writerows(_dump(row).model_dump(mode='json') for row in rows)
+    return buffer.getvalue()
+
+
+async def iter_lines(chunks):
+    """Split an async stream of byte chunks into numbered lines."""
+    buffer = b''
+    line_number = 0
+
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            line_number += 1
+            yield line_number, line
+
+    if buffer:
+        yield line_number + 1, buffer
+
+
+def _errors(exc: ValidationError):
+    return exc.errors(
+        include_url=False, include_context=False, include_input=False
+    )
+
+
+class _LineFeed:
+    """Iterator a single csv.reader pulls queued lines from."""
+
+    def __init__(self):
+        self.lines = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+async def _csv_records(chunks):
+    """Group lines into whole CSV records: (first line number, lines).
+
+    A record ends on a line that leaves its double quotes balanced, so
+    quoted fields may span lines. A record still open at the end of the
+    body is yielded with `complete=False`.
+    """
+    record, start, quotes = [], None, 0
+
+    async for line_number, line in iter_lines(chunks):
+        if start is None:
+            if not line.strip():
+                continue
+            start = line_number
+
+        record.append(line)
+        quotes += line.count(b'"')
+
+        if quotes % 2 == 0:
+            yield start, record, True
+            record, start, quotes = [], None, 0
+
+    if record:
+        yield start, record, False
+
+
+async def parse_todos(chunks, format: str):
+    """Yield (line_number, todo, errors) for each record of an upload.
+
+    Records are validated one at a time against TodoSchema, so the body is
+    never held in memory. CSV input needs a header record; quoted fields
+    may contain newlines, and every record must have as many fields as
+    the header.
+    """
+    if format == 'ndjson':
+        async for line_number, line in iter_lines(chunks):
+            if not line.strip():
+                continue
+            try:
+                yield line_number, TodoSchema.model_validate_json(line), None
+            except ValidationError as exc:
+                yield line_number, None, _errors(exc)
+        return
+
+    feed = _LineFeed()
+    reader = csv.reader(feed)
+    header = None
+
+    async for line_number, record, complete in _csv_records(chunks):
+        try:
+            if not complete:
+                raise ValueError('Unterminated quoted field')
+
+            feed.lines.extend(f'{line.decode()}\n' for line in record)
+            values = next(reader)
+
+            if header is None:
+                header = values
+                continue
+
+            if len(values) != len(header):
+                raise ValueError(
+                    f'Expected {len(header)} fields, got {len(values)}'
+                )
+
+            todo = TodoSchema.model_validate(dict(zip(header, values)))
+            yield line_number, todo, None
+        except ValidationError as exc:
+            yield line_number, None, _errors(exc)
+        except (ValueError, csv.Error) as exc:
+            feed.lines.clear()
+            yield line_number, None, [{'type': 'value_error', 'msg': str(exc)}]
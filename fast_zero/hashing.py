@@ -0,0 +1,49 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from time import perf_counter
+
+from fastapi import HTTPException
+
+from fast_zero.metrics import (
+    HASHING_DURATION,
+    HASHING_PENDING,
+    HASHING_REJECTED,
+)
+
+
+class HashingPool:
+    """Bounded thread pool that keeps password hashing off the event loop.
+
+    At most `max_workers` hashes run at once and `max_queue` more may wait;
+    anything beyond that is rejected with 503 instead of piling up.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self.max_workers = max_workers
+        self.max_pending = max_workers + max_queue
+        self.pending = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='hashing'
+        )
+
+    async def run(self, func, *args):
+        if self.pending >= self.max_pending:
+            HASHING_REJECTED.inc()
+            raise HTTPException(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail='Server busy, try again later',
+                headers={'Retry-After': '1'},
+            )
+
+        self.pending += 1
+        HASHING_PENDING.inc()
+        start = perf_counter()
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self.pending -= 1
+            HASHING_PENDING.dec()
+            HASHING_DURATION.observe(perf_counter() - start)
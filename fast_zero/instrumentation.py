@@ -0,0 +1,141 @@
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+
+logger = logging.getLogger('fast_zero.requests')
+
+
+@dataclass
+class RequestMetrics:
+    sql_count: int = 0
+    sql_seconds: float = 0.0
+    sql_rows: int = 0
+    timings: dict[str, float] = field(default_factory=dict)
+
+    def add(self, name: str, seconds: float):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def server_timing(self, total_seconds: float) -> str:
+        entries = [
+            f'sql;dur={self.sql_seconds * 1000:.2f};'
+            f'desc="{self.sql_count} queries, {self.sql_rows} rows"'
+        ]
+        entries.extend(
+            f'{name};dur={seconds * 1000:.2f}'
+            for name, seconds in self.timings.items()
+        )
+        entries.append(f'total;dur={total_seconds * 1000:.2f}')
+        return ', '.join(entries)
+
+
+current_metrics: ContextVar[RequestMetrics | None] = ContextVar(
+    'current_metrics', default=None
+)
+
+
+@contextmanager
+def timed(name: str):
+    """Add the time spent in the block to the current request's timings."""
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        metrics = current_metrics.get()
+        if metrics is not None:
+            metrics.add(name, perf_counter() - start)
+
+
+class SQLTimer:
+    """Engine event hooks feeding SQL counts and time into the request."""
+
+    def __init__(self, slow_query_ms: float | None = None):
+        self.slow_query_ms = slow_query_ms
+
+    @staticmethod
+    def before_cursor_execute(conn, cursor, statement, *args):
+        conn.info.setdefault('query_start', []).append(perf_counter())
+
+    def after_cursor_execute(self, conn, cursor, statement, *args):
+        elapsed = perf_counter() - conn.info['query_start'].pop()
+        metrics = current_metrics.get()
+
+        if metrics is not None:
+            metrics.sql_count += 1
+            metrics.sql_seconds += elapsed
+            metrics.sql_rows += max(cursor.rowcount, 0)
+
+        if (
+            self.slow_query_ms is not None
+            and elapsed * 1000 >= self.slow_query_ms
+        ):
+            logger.warning(
+                'slow query (%.2f ms): %s',
+                elapsed * 1000,
+                statement,
+                extra={'duration_ms': elapsed * 1000, 'statement': statement},
+            )
+
+    def install(self, engine: Engine):
+        event.listen(
+            engine, 'before_cursor_execute', self.before_cursor_execute
+        )
+        event.listen(engine, 'after_cursor_execute', self.after_cursor_execute)
+
+
+class InstrumentationMiddleware:
+    """Collect per-request timings, expose them as Server-Timing and log."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        start = perf_counter()
+        status_code = None
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                MutableHeaders(scope=message).append(
+                    'Server-Timing',
+                    metrics.server_timing(perf_counter() - start),
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_metrics.reset(token)
+            duration_ms = (perf_counter() - start) * 1000
+            logger.info(
+                '%s %s %s %.2f ms',
+                scope['method'],
+                scope['path'],
+                status_code,
+                duration_ms,
+                extra={
+                    'method': scope['method'],
+                    'path': scope['path'],
+                    'status_code': status_code,
+                    'duration_ms': duration_ms,
+                    'sql_count': metrics.sql_count,
+                    'sql_ms': metrics.sql_seconds * 1000,
+                    'sql_rows': metrics.sql_rows,
+                    'timings_ms': {
+                        name: seconds * 1000
+                        for name, seconds in metrics.timings.items()
+                    },
+                },
+            )
@@ -0,0 +1,109 @@
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from time import monotonic
+
+from jwt import PyJWK
+from jwt.exceptions import DecodeError
+
+# JWK members that carry private key material
+PRIVATE_MEMBERS = {'d', 'p', 'q', 'dp', 'dq', 'qi', 'oth'}
+
+
+@dataclass(frozen=True, slots=True)
+class SigningKey:
+    kid: str
+    algorithm: str
+    key: object
+
+
+class KeySet:
+    """Asymmetric JWT keys read from a JWKS file and kept parsed in memory.
+
+    The first key in the file signs new tokens; every key verifies. Rotate
+    by prepending a new key and dropping the old one once its tokens have
+    expired. The file is re-read when its mtime changes, checked at most
+    every `reload_seconds`.
+    """
+
+    def __init__(self, path: str | Path, reload_seconds: float = 5):
+        self.path = Path(path)
+        self.reload_seconds = reload_seconds
+        self.loads = 0
+        self._mtime = None
+        self._checked_at = None
+        self._signing = None
+        self._verifying = {}
+        self._public = []
+
+    def _refresh(self):
+        now = monotonic()
+
+        if (
+            self._checked_at is not None
+            and now - self._checked_at < self.reload_seconds
+        ):
+            return
+
+        self._checked_at = now
+        mtime = self.path.stat().st_mtime_ns
+
+        if mtime == self._mtime:
+            return
+
+        jwks = json.loads(self.path.read_text())['keys']
+        signing, verifying, public = None, {}, []
+
+        for jwk in jwks:
+            # Shared secrets stay in SECRET_KEY; this set is asymmetric only
+            if jwk.get('kty') == 'oct':
+                continue
+
+            parsed = PyJWK.from_dict(jwk)
+            is_private = 'd' in jwk
+            verify_key = parsed.key.public_key() if is_private else parsed.key
+            verifying[jwk['kid']] = (parsed.algorithm_name, verify_key)
+            public.append({
+                **{
+                    name: value
+                    for name, value in jwk.items()
+                    if name not in PRIVATE_MEMBERS
+                },
+                'alg': parsed.algorithm_name,
+            })
+
+            if signing is None and is_private:
+                signing = SigningKey(
+                    jwk['kid'], parsed.algorithm_name, parsed.key
+                )
+
+        self._signing = signing
+        self._verifying = verifying
+        self._public = public
+        self._mtime = mtime
+        self.loads += 1
+
+    def generation(self) -> int:
+        """Changes whenever the file is re-read, e.g. to key caches on."""
+        self._refresh()
+        return self.loads
+
+    def signing_key(self) -> SigningKey:
+        self._refresh()
+
+        if self._signing is None:
+            raise RuntimeError(f'No private key in {self.path}')
+
+        return self._signing
+
+    def verification_key(self, kid: str | None):
+        self._refresh()
+
+        try:
+            return self._verifying[kid]
+        except KeyError:
+            raise DecodeError('Unknown key id')
+
+    def public_jwks(self) -> dict:
+        self._refresh()
+        return {'keys': self._public}
@@ -0,0 +1,122 @@
+import os
+from time import perf_counter
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from starlette.responses import Response
+
+REQUEST_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'Request latency by route template.',
+    ['method', 'route', 'status'],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight',
+    'Requests currently being served.',
+    multiprocess_mode='livesum',
+)
+
+DB_POOL_CHECKOUTS = Counter(
+    'db_pool_checkouts_total', 'Connections checked out of the pool.'
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    'db_pool_checked_out',
+    'Connections currently checked out of the pool.',
+    multiprocess_mode='livesum',
+)
+DB_POOL_OVERFLOW = Gauge(
+    'db_pool_overflow',
+    'Connections open beyond the pool size.',
+    multiprocess_mode='livesum',
+)
+DB_POOL_WAIT = Histogram(
+    'db_pool_wait_seconds',
+    'Time spent waiting for a pooled connection, excluding connecting.',
+)
+
+AUTH_FAILURES = Counter(
+    'auth_failures_total', 'Rejected logins and tokens.', ['reason']
+)
+
+HASHING_PENDING = Gauge(
+    'hashing_pending',
+    'Password hashes running or queued.',
+    multiprocess_mode='livesum',
+)
+HASHING_REJECTED = Counter(
+    'hashing_rejected_total', 'Password hashes rejected with 503.'
+)
+HASHING_DURATION = Histogram(
+    'hashing_duration_seconds', 'Password hash time, queueing included.'
+)
+
+# Requests that matched no route share one label value
+UNMATCHED_ROUTE = '<unmatched>'
+
+
+class MetricsMiddleware:
+    """Observe latency per route template and track in-flight requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = perf_counter()
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            route = scope.get('route')
+            REQUEST_LATENCY.labels(
+                scope['method'],
+                route.path if route else UNMATCHED_ROUTE,
+                str(status_code),
+            ).observe(perf_counter() - start)
+
+
+# With several uvicorn workers, point PROMETHEUS_MULTIPROC_DIR at an empty
+# directory shared by all of them before the server starts: each worker
+# writes its samples there and the scrape merges them, whichever worker
+# answers it. Workers drop their live gauges when they shut down (see
+# mark_process_dead); wipe the directory on deploy too, since a killed
+# worker never gets to.
+def metrics_response():
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
+
+def mark_process_dead():
+    """Stop summing this worker's livesum gauges once it exits.
+
+    Otherwise a recycled worker's last in-flight and checked-out counts
+    stay in the directory and inflate every later scrape.
+    """
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        multiprocess.mark_process_dead(os.getpid())
@@ -1,7 +1,7 @@
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import ForeignKey, func
+from sqlalchemy import FetchedValue, ForeignKey, Index, func
 from sqlalchemy.orm import Mapped, mapped_column, registry, relationship
 
 table_registry = registry()
@@ -18,6 +18,8 @@ class TodoState(str, Enum):
 @table_registry.mapped_as_dataclass
 class User:
     __tablename__ = 'users'
+    # Fetch server-generated columns with INSERT/UPDATE ... RETURNING
+    __mapper_args__ = {'eager_defaults': True}
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     username: Mapped[str] = mapped_column(unique=True)
@@ -29,6 +31,14 @@ class User:
     updated_at: Mapped[datetime] = mapped_column(
         init=False, server_default=func.now(), onupdate=func.now()
     )
+    # Bumped on account changes; tokens carrying an older `ver` are revoked.
+    # The bump is computed in SQL, so have UPDATE ... RETURNING fetch it
+    token_version: Mapped[int] = mapped_column(
+        init=False,
+        default=0,
+        server_default='0',
+        server_onupdate=FetchedValue(),
+    )
     todos: Mapped[list['Todo']] = relationship(
         init=False, cascade='all, delete-orphan', lazy='selectin'
     )
@@ -37,6 +47,12 @@ class User:
 @table_registry.mapped_as_dataclass
 class Todo:
     __tablename__ = 'todos'
+    __table_args__ = (
+        Index('ix_todos_user_id_id', 'user_id', 'id'),
+        Index('ix_todos_user_id_state', 'user_id', 'state'),
+        Index('ix_todos_user_id_updated_at', 'user_id', 'updated_at'),
+    )
+    __mapper_args__ = {'eager_defaults': True}
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     title: Mapped[str]
@@ -50,3 +66,23 @@ class Todo:
     )
 
     user_id: Mapped[int] = mapped_column(ForeignKey('users.id'))
+
+
+@table_registry.mapped_as_dataclass
+class TodoTombstone:
+    __tablename__ = 'todo_tombstones'
+    __table_args__ = (
+        Index(
+            'ix_todo_tombstones_user_id_deleted_at', 'user_id', 'deleted_at'
+        ),
+    )
+    __mapper_args__ = {'eager_defaults': True}
+
+    id: Mapped[int] = mapped_column(init=False, primary_key=True)
+    todo_id: Mapped[int]
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey('users.id', ondelete='CASCADE')
+    )
+    deleted_at: Mapped[datetime] = mapped_column(
+        init=False, server_default=func.now()
+    )
@@ -0,0 +1,32 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+
+
+def encode_cursor(last_id: int) -> str:
+    return urlsafe_b64encode(str(last_id).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        return int(urlsafe_b64decode(cursor.encode()))
+    except (Base64Error, ValueError):
+        raise ValueError('Invalid cursor')
+
+
+def paginate(query, page, key):
+    """Apply keyset pagination on `key` when a cursor is given, else offset."""
+    query = query.order_by(key)
+
+    if page.cursor is not None:
+        query = query.where(key > page.cursor)
+    else:
+        query = query.offset(page.offset)
+
+    return query.limit(page.limit)
+
+
+def next_cursor(rows, page):
+    if page.limit and len(rows) == page.limit:
+        return encode_cursor(rows[-1].id)
+
+    return None
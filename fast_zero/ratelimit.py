@@ -0,0 +1,88 @@
+from collections import OrderedDict
+from time import monotonic
+
+
+class MemoryBackend:
+    """Token buckets kept in this process, at most `maxsize` keys.
+
+    The least recently used key is dropped first, which refills its
+    bucket; size it above the number of distinct clients seen within a
+    refill period. A shared backend (e.g. Redis) only needs `take`,
+    `refund` and `clear` with the same signatures.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+
+    def _tokens(self, key, capacity: int, per_second: float, now: float):
+        tokens, updated_at = self._buckets.get(key, (capacity, now))
+        return min(capacity, tokens + (now - updated_at) * per_second)
+
+    def take(self, key, capacity: int, per_second: float) -> float:
+        """Spend a token for `key`, or return seconds until one is free."""
+        now = monotonic()
+        tokens = self._tokens(key, capacity, per_second, now)
+
+        if tokens < 1:
+            return (1 - tokens) / per_second
+
+        self._buckets[key] = (tokens - 1, now)
+        self._buckets.move_to_end(key)
+
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+
+        return 0.0
+
+    def refund(self, key, capacity: int, per_second: float):
+        """Give back a token spent by `take`, never above `capacity`."""
+        if key not in self._buckets:
+            return
+
+        now = monotonic()
+        tokens = self._tokens(key, capacity, per_second, now)
+        self._buckets[key] = (min(capacity, tokens + 1), now)
+
+    def clear(self):
+        self._buckets.clear()
+
+
+class LoginLimiter:
+    """Per-IP and per-username token buckets for the login endpoint.
+
+    Every attempt spends an IP token and a username token up front, so
+    concurrent guesses cannot all slip through before the first one fails.
+    A successful login refunds its username token, so a user who keeps
+    logging in successfully is never locked out by their own bucket.
+    """
+
+    def __init__(  # noqa: PLR0913, PLR0917
+        self,
+        backend,
+        ip_burst: int,
+        ip_per_minute: float,
+        username_burst: int,
+        username_per_minute: float,
+    ):
+        self.backend = backend
+        self.ip_limit = (ip_burst, ip_per_minute / 60)
+        self.username_limit = (username_burst, username_per_minute / 60)
+
+    @staticmethod
+    def _username_key(username: str) -> str:
+        return f'username:{username.strip().lower()}'
+
+    def check(self, ip: str, username: str) -> float:
+        """Seconds the caller must wait, 0 when the attempt may proceed."""
+        return self.backend.take(f'ip:{ip}', *self.ip_limit) or (
+            self.backend.take(
+                self._username_key(username), *self.username_limit
+            )
+        )
+
+    def succeeded(self, username: str):
+        self.backend.refund(self._username_key(username), *self.username_limit)
+
+    def reset(self):
+        self.backend.clear()
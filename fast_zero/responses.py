@@ -0,0 +1,29 @@
+from functools import cache
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from fast_zero.instrumentation import timed
+
+
+@cache
+def _adapter(model):
+    return TypeAdapter(model)
+
+
+class ModelResponse(Response):
+    """JSON response validated once against `model` and dumped to bytes.
+
+    Returning it skips FastAPI's response_model pass (a second validation
+    plus jsonable encoding); keep `response_model` on the route for docs.
+    """
+
+    media_type = 'application/json'
+
+    def __init__(self, model, content, **kwargs):
+        adapter = _adapter(model)
+        with timed('serialize'):
+            body = adapter.dump_json(
+                adapter.validate_python(content, from_attributes=True)
+            )
+        super().__init__(content=body, **kwargs)
@@ -1,18 +1,25 @@
 from http import HTTPStatus
+from math import ceil
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fast_zero.database import get_session
+from fast_zero.metrics import AUTH_FAILURES
 from fast_zero.models import User
 from fast_zero.schemas import Token
 from fast_zero.security import (
+    PRINCIPAL_LOAD_OPTIONS,
     create_access_token,
     get_current_user,
-    verify_password,
+    login_limiter,
+    principal_cache,
+    public_jwks,
+    token_claims,
+    verify_and_update_password_async,
 )
 
 router = APIRouter(prefix='/auth', tags=['auth'])
@@ -22,29 +29,72 @@ CurrentUser = Annotated[User, Depends(get_current_user)]
 
 
 @router.post('/token', response_model=Token)
-async def login_for_access_token(form_data: OAuthForm, session: Session):
+async def login_for_access_token(
+    request: Request, form_data: OAuthForm, session: Session
+):
+    retry_after = login_limiter.check(
+        request.client.host if request.client else '', form_data.username
+    )
+
+    if retry_after:
+        AUTH_FAILURES.labels('rate_limited').inc()
+        raise HTTPException(
+            status_code=HTTPStatus.TOO_MANY_REQUESTS,
+            detail='Too many login attempts, try again later',
+            headers={'Retry-After': str(ceil(retry_after))},
+        )
+
     user = await session.scalar(
-        select(User).where(User.email == form_data.username)
+        select(User)
+        .options(*PRINCIPAL_LOAD_OPTIONS)
+        .where(User.email == form_data.username)
     )
 
     if not user:
+        AUTH_FAILURES.labels('bad_credentials').inc()
         raise HTTPException(
             status_code=HTTPStatus.UNAUTHORIZED,
             detail='Incorrect email or password',
         )
 
-    if not verify_password(form_data.password, user.password):
+    verified, updated_hash = await verify_and_update_password_async(
+        form_data.password, user.password
+    )
+
+    if not verified:
+        AUTH_FAILURES.labels('bad_credentials').inc()
         raise HTTPException(
             status_code=HTTPStatus.UNAUTHORIZED,
             detail='Incorrect email or password',
         )
 
-    access_token = create_access_token(data={'sub': user.email})
+    login_limiter.succeeded(form_data.username)
+
+    # Stored hash used outdated Argon2 parameters: keep the upgraded one
+    if updated_hash is not None:
+        user.password = updated_hash
+        await session.commit()
+        principal_cache.invalidate(user.email)
+
+    access_token = create_access_token(data=token_claims(user))
 
     return {'access_token': access_token, 'token_type': 'bearer'}
 
 
 @router.post('/refresh_token', response_model=Token)
 def refresh_access_token(user: CurrentUser):
-    new_access_token = create_access_token(data={'sub': user.email})
+    new_access_token = create_access_token(data=token_claims(user))
     return {'access_token': new_access_token, 'token_type': 'bearer'}
+
+
+@router.get('/jwks')
+def read_jwks():
+    """Public keys for verifying our tokens without calling this service."""
+    jwks = public_jwks()
+
+    if jwks is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND, detail='No key set configured'
+        )
+
+    return jwks
@@ -1,30 +1,102 @@
+from datetime import UTC, datetime, timedelta
 from http import HTTPStatus
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy import select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import delete, insert, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fast_zero.database import get_session
-from fast_zero.models import Todo, User
+from fast_zero.etag import etag_matches, make_etag, not_modified
+from fast_zero.formats import (
+    MEDIA_TYPES,
+    csv_chunk,
+    csv_header,
+    ndjson_chunk,
+    parse_todos,
+)
+from fast_zero.models import Todo, TodoTombstone
+from fast_zero.pagination import next_cursor, paginate
+from fast_zero.responses import ModelResponse
 from fast_zero.schemas import (
+    BulkResult,
     FilterTodo,
+    FilterTodoBulk,
+    ImportReport,
     Message,
+    TodoBulk,
+    TodoChanges,
     TodoList,
     TodoPublic,
     TodoSchema,
+    TodoStateUpdate,
     TodoUpdate,
 )
-from fast_zero.security import get_current_user
+from fast_zero.search import text_match
+from fast_zero.security import Principal, get_current_principal
+from fast_zero.settings import Settings
+
+settings = Settings()
 
 router = APIRouter()
 router = APIRouter(prefix='/todos', tags=['todos'])
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentPrincipal = Annotated[Principal, Depends(get_current_principal)]
+# Columns needed by TodoPublic; reads select these instead of whole entities
+TODO_PUBLIC_COLUMNS = (
+    Todo.id,
+    Todo.title,
+    Todo.description,
+    Todo.state,
+    Todo.created_at,
+    Todo.updated_at,
+)
+
+
+def _filter_todos(statement, todo_filter, session):
+    search = {
+        'backend': settings.TODO_SEARCH_BACKEND,
+        'dialect': session.bind.dialect.name,
+    }
+
+    if todo_filter.title:
+        statement = statement.where(
+            text_match(Todo.title, todo_filter.title, **search)
+        )
+
+    if todo_filter.description:
+        statement = statement.where(
+            text_match(Todo.description, todo_filter.description, **search)
+        )
+
+    if todo_filter.state:
+        statement = statement.where(Todo.state == todo_filter.state)
+
+    return statement
+
+
+async def _add_tombstones(session, user, todo_ids):
+    """Record deleted todo ids so /todos/changes can report them."""
+    if todo_ids:
+        await session.execute(
+            insert(TodoTombstone),
+            [{'todo_id': todo_id, 'user_id': user.id} for todo_id in todo_ids],
+        )
+
+
+async def _import_chunk(session, todos, errors):
+    if todos:
+        await session.execute(insert(Todo), todos)
+        await session.commit()
+
+    return {'imported': len(todos), 'errors': errors}
 
 
 @router.post('/', response_model=TodoPublic)
-async def create_todo(todo: TodoSchema, user: CurrentUser, session: Session):
+async def create_todo(
+    todo: TodoSchema, user: CurrentPrincipal, session: Session
+):
     db_todo = Todo(
         title=todo.title,
         description=todo.description,
@@ -33,43 +105,238 @@ async def create_todo(todo: TodoSchema, user: CurrentUser, session: Session):
     )
     session.add(db_todo)
     await session.commit()
-    await session.refresh(db_todo)
 
     return db_todo
 
 
-@router.get('/', response_model=TodoList)
-async def list_todos(
+@router.post('/bulk', status_code=HTTPStatus.CREATED, response_model=TodoList)
+async def create_todos_bulk(
+    bulk: TodoBulk, user: CurrentPrincipal, session: Session
+):
+    if len(bulk.todos) > settings.TODO_BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            detail=f'At most {settings.TODO_BULK_MAX_ITEMS} todos per request',
+        )
+
+    if not bulk.todos:
+        return {'todos': []}
+
+    db_todos = await session.scalars(
+        insert(Todo).returning(Todo, sort_by_parameter_order=True),
+        [{**todo.model_dump(), 'user_id': user.id} for todo in bulk.todos],
+    )
+    db_todos = db_todos.all()
+    await session.commit()
+
+    return {'todos': db_todos}
+
+
+@router.patch('/bulk', response_model=BulkResult)
+async def patch_todos_bulk(
     session: Session,
-    user: CurrentUser,
-    todo_filter: Annotated[FilterTodo, Query()],
+    user: CurrentPrincipal,
+    todo_filter: Annotated[FilterTodoBulk, Query()],
+    todo: TodoStateUpdate,
 ):
-    query = select(Todo).where(Todo.user_id == user.id)
+    statement = _filter_todos(
+        update(Todo).where(Todo.user_id == user.id), todo_filter, session
+    )
+    result = await session.execute(
+        statement.values(state=todo.state).execution_options(
+            synchronize_session=False
+        )
+    )
+    await session.commit()
 
-    if todo_filter.title:
-        query = query.filter(Todo.title.contains(todo_filter.title))
+    return {'count': result.rowcount}
 
-    if todo_filter.description:
-        query = query.filter(
-            Todo.description.contains(todo_filter.description)
+
+@router.delete('/bulk', response_model=BulkResult)
+async def delete_todos_bulk(
+    session: Session,
+    user: CurrentPrincipal,
+    todo_filter: Annotated[FilterTodoBulk, Query()],
+):
+    statement = _filter_todos(
+        delete(Todo).where(Todo.user_id == user.id), todo_filter, session
+    )
+    deleted_ids = await session.scalars(
+        statement.returning(Todo.id).execution_options(
+            synchronize_session=False
+        )
+    )
+    deleted_ids = deleted_ids.all()
+    await _add_tombstones(session, user, deleted_ids)
+    await session.commit()
+
+    return {'count': len(deleted_ids)}
+
+
+@router.get('/changes', response_model=TodoChanges)
+async def list_todo_changes(
+    session: Session, user: CurrentPrincipal, since: datetime | None = None
+):
+    query = select(*TODO_PUBLIC_COLUMNS).where(Todo.user_id == user.id)
+    deleted = []
+
+    if since is not None:
+        # Timestamp columns hold naive UTC
+        if since.tzinfo is not None:
+            since = since.astimezone(UTC).replace(tzinfo=None)
+
+        # Rows are stamped with their transaction's start time (whole
+        # seconds on SQLite), so a write can commit behind a cursor that
+        # was already handed out. Re-scan a window before the cursor so it
+        # is still picked up; changes inside it are sent again and clients
+        # must apply them idempotently.
+        window_start = since - timedelta(
+            seconds=settings.TODO_CHANGES_OVERLAP_SECONDS
+        )
+        query = query.where(Todo.updated_at > window_start)
+        deleted = await session.execute(
+            select(TodoTombstone.todo_id, TodoTombstone.deleted_at).where(
+                TodoTombstone.user_id == user.id,
+                TodoTombstone.deleted_at > window_start,
+            )
         )
+        deleted = deleted.all()
 
-    if todo_filter.state:
-        query = query.filter(Todo.state == todo_filter.state)
+    todos = await session.execute(query.order_by(Todo.updated_at))
+    todos = todos.all()
+
+    cursor = max(
+        [todo.updated_at for todo in todos]
+        + [deleted_at for _, deleted_at in deleted]
+        + ([since] if since else []),
+        default=None,
+    )
+
+    return {
+        'todos': todos,
+        'deleted': [todo_id for todo_id, _ in deleted],
+        'cursor': cursor,
+    }
+
+
+@router.post('/import', response_model=ImportReport)
+async def import_todos(
+    request: Request, session: Session, user: CurrentPrincipal
+):
+    content_type = request.headers.get('content-type', '').split(';')[0]
+    formats = {media: name for name, media in MEDIA_TYPES.items()}
+
+    if content_type not in formats:
+        raise HTTPException(
+            status_code=HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+            detail='Upload NDJSON (application/x-ndjson) or CSV (text/csv)',
+        )
+
+    chunks, todos, errors = [], [], []
+    records = parse_todos(request.stream(), formats[content_type])
+
+    async for line_number, todo, line_errors in records:
+        if line_errors:
+            errors.append({'line': line_number, 'errors': line_errors})
+        else:
+            todos.append({**todo.model_dump(), 'user_id': user.id})
+
+        if len(todos) + len(errors) >= settings.TODO_IMPORT_CHUNK_SIZE:
+            chunks.append(await _import_chunk(session, todos, errors))
+            todos, errors = [], []
+
+    if todos or errors:
+        chunks.append(await _import_chunk(session, todos, errors))
+
+    return {
+        'imported': sum(chunk['imported'] for chunk in chunks),
+        'failed': sum(len(chunk['errors']) for chunk in chunks),
+        'chunks': chunks,
+    }
 
-    todos = await session.scalars(
-        query.offset(todo_filter.offset).limit(todo_filter.limit)
+
+@router.get('/export', response_class=StreamingResponse)
+async def export_todos(
+    session: Session,
+    user: CurrentPrincipal,
+    format: Literal['ndjson', 'csv'] = 'ndjson',
+):
+    query = (
+        select(*TODO_PUBLIC_COLUMNS)
+        .where(Todo.user_id == user.id)
+        .order_by(Todo.id)
+        .execution_options(yield_per=settings.TODO_EXPORT_CHUNK_SIZE)
     )
+    engine = session.bind
 
-    return {'todos': todos.all()}
+    # The request session is closed before the body is sent, so the
+    # stream holds its own connection and a server-side cursor.
+    async def chunks():
+        if format == 'csv':
+            yield csv_header()
+
+        async with engine.connect() as conn:
+            result = await conn.stream(query)
+            async for rows in result.partitions():
+                yield (
+                    csv_chunk(rows) if format == 'csv' else ndjson_chunk(rows)
+                )
+
+    return StreamingResponse(
+        chunks(),
+        media_type=MEDIA_TYPES[format],
+        headers={
+            'Content-Disposition': f'attachment; filename="todos.{format}"'
+        },
+    )
+
+
+@router.get('/', response_model=TodoList)
+async def list_todos(
+    request: Request,
+    session: Session,
+    user: CurrentPrincipal,
+    todo_filter: Annotated[FilterTodo, Query()],
+):
+    query = _filter_todos(
+        select(*TODO_PUBLIC_COLUMNS).where(Todo.user_id == user.id),
+        todo_filter,
+        session,
+    )
+
+    todos = await session.execute(paginate(query, todo_filter, Todo.id))
+    todos = todos.all()
+    # Derived from the page itself, so requests without If-None-Match pay
+    # for no extra query; a 304 still skips serializing the page
+    etag = make_etag(
+        user.id,
+        request.url.query,
+        *((todo.id, todo.updated_at) for todo in todos),
+    )
+
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    return ModelResponse(
+        TodoList,
+        {'todos': todos, 'next_cursor': next_cursor(todos, todo_filter)},
+        headers={'ETag': etag},
+    )
 
 
 @router.patch('/{todo_id}', response_model=TodoPublic)
 async def patch_todo(
-    todo_id: int, session: Session, user: CurrentUser, todo: TodoUpdate
+    todo_id: int, session: Session, user: CurrentPrincipal, todo: TodoUpdate
 ):
+    values = todo.model_dump(exclude_unset=True)
+    statement = (
+        update(Todo).values(**values).returning(Todo)
+        if values
+        else select(Todo)
+    )
+
     db_todo = await session.scalar(
-        select(Todo).where(Todo.user_id == user.id, Todo.id == todo_id)
+        statement.where(Todo.user_id == user.id, Todo.id == todo_id)
     )
 
     if not db_todo:
@@ -77,27 +344,24 @@ async def patch_todo(
             status_code=HTTPStatus.NOT_FOUND, detail='Task not found'
         )
 
-    for key, value in todo.model_dump(exclude_unset=True).items():
-        setattr(db_todo, key, value)
-
-    session.add(db_todo)
     await session.commit()
-    await session.refresh(db_todo)
 
     return db_todo
 
 
 @router.delete('/{todo_id}', response_model=Message)
-async def delete_todo(todo_id: int, session: Session, user: CurrentUser):
-    todo = await session.scalar(
-        select(Todo).where(Todo.user_id == user.id, Todo.id == todo_id)
+async def delete_todo(todo_id: int, session: Session, user: CurrentPrincipal):
+    deleted_id = await session.scalar(
+        delete(Todo)
+        .where(Todo.user_id == user.id, Todo.id == todo_id)
+        .returning(Todo.id)
     )
 
-    if not todo:
+    if deleted_id is None:
         raise HTTPException(
             status_code=HTTPStatus.NOT_FOUND, detail='Task not found'
         )
 
-    await session.delete(todo)
+    await _add_tombstones(session, user, [deleted_id])
     await session.commit()
     return {'message': 'Task has been deleted successfuly'}
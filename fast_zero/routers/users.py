@@ -1,13 +1,16 @@
 from http import HTTPStatus
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from fast_zero.database import get_session
+from fast_zero.etag import etag_matches, make_etag, not_modified
 from fast_zero.models import User
+from fast_zero.pagination import next_cursor, paginate
+from fast_zero.responses import ModelResponse
 from fast_zero.schemas import (
     FilterPage,
     Message,
@@ -16,22 +19,29 @@ from fast_zero.schemas import (
     UserSchema,
 )
 from fast_zero.security import (
-    get_current_user,
-    get_password_hash,
+    PRINCIPAL_LOAD_OPTIONS,
+    Principal,
+    get_current_principal,
+    get_password_hash_async,
+    principal_cache,
+    token_version_cache,
 )
 
 router = APIRouter(prefix='/users', tags=['users'])
 Session = Annotated[AsyncSession, Depends(get_session)]
-CurrentUser = Annotated[User, Depends(get_current_user)]
+CurrentPrincipal = Annotated[Principal, Depends(get_current_principal)]
+# Columns needed by UserPublic (plus updated_at for ETags); never the hash
+USER_PUBLIC_COLUMNS = (User.id, User.username, User.email, User.updated_at)
 
 
 @router.post('/', status_code=HTTPStatus.CREATED, response_model=UserPublic)
 async def create_user(user: UserSchema, session: Session):
-    db_user = await session.scalar(
-        select(User).where(
+    db_user = await session.execute(
+        select(User.username, User.email).where(
             (User.username == user.username) | (User.email == user.email)
         )
     )
+    db_user = db_user.first()
 
     if db_user:
         if db_user.username == user.username:
@@ -44,32 +54,71 @@ async def create_user(user: UserSchema, session: Session):
                 status_code=HTTPStatus.CONFLICT, detail='Email already exists'
             )
 
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
 
     db_user = User(
         username=user.username, password=hashed_password, email=user.email
     )
     session.add(db_user)
     await session.commit()
-    await session.refresh(db_user)
 
     return db_user
 
 
 @router.get('/', response_model=UserList)
 async def read_users(
-    session: Session, filter_users: Annotated[FilterPage, Query()]
+    request: Request,
+    session: Session,
+    filter_users: Annotated[FilterPage, Query()],
 ):
-    query = await session.scalars(
-        select(User).offset(filter_users.offset).limit(filter_users.limit)
+    query = await session.execute(
+        paginate(select(*USER_PUBLIC_COLUMNS), filter_users, User.id)
     )
     users = query.all()
-    return {'users': users}
+    # Derived from the page itself, see list_todos
+    etag = make_etag(
+        request.url.query, *((user.id, user.updated_at) for user in users)
+    )
+
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    return ModelResponse(
+        UserList,
+        {'users': users, 'next_cursor': next_cursor(users, filter_users)},
+        headers={'ETag': etag},
+    )
 
 
 @router.get('/{user_id}', response_model=UserPublic)
-async def get_one_user(user_id: int, session: Session):
-    db_user = await session.scalar(select(User).where(User.id == user_id))
+async def get_one_user(
+    user_id: int, request: Request, response: Response, session: Session
+):
+    db_user = await session.execute(
+        select(*USER_PUBLIC_COLUMNS).where(User.id == user_id)
+    )
+    db_user = db_user.first()
+
+    if not db_user:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND, detail='User Not Found'
+        )
+
+    etag = make_etag(db_user.id, db_user.updated_at)
+
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    response.headers['ETag'] = etag
+
+    return db_user
+
+
+async def _own_user(session: AsyncSession, principal: Principal) -> User:
+    # This session's row, never the instance shared through principal_cache
+    db_user = await session.get(
+        User, principal.id, options=PRINCIPAL_LOAD_OPTIONS
+    )
 
     if not db_user:
         raise HTTPException(
@@ -84,39 +133,51 @@ async def update_user(
     user_id: int,
     user: UserSchema,
     session: Session,
-    current_user: CurrentUser,
+    principal: CurrentPrincipal,
 ):
-    if current_user.id != user_id:
+    if principal.id != user_id:
         raise HTTPException(
             status_code=HTTPStatus.FORBIDDEN, detail='Not enough permissions'
         )
+    db_user = await _own_user(session, principal)
+    old_email = db_user.email
+
     try:
-        current_user.username = user.username
-        current_user.password = get_password_hash(user.password)
-        current_user.email = user.email
+        db_user.token_version = User.token_version + 1
+        db_user.username = user.username
+        db_user.password = await get_password_hash_async(user.password)
+        db_user.email = user.email
         await session.commit()
-        await session.refresh(current_user)
-
-        return current_user
 
     except IntegrityError:
+        principal_cache.invalidate(old_email)
         raise HTTPException(
             status_code=HTTPStatus.CONFLICT,
             detail='Username or Email already exists',
         )
 
+    # Only after the commit, so a concurrent lookup cannot re-cache the
+    # old row (see TTLCache.set)
+    token_version_cache.invalidate(db_user.id)
+    principal_cache.invalidate(old_email)
+
+    return db_user
+
 
 @router.delete('/{user_id}', response_model=Message)
 async def delete_user(
     user_id: int,
     session: Session,
-    current_user: CurrentUser,
+    principal: CurrentPrincipal,
 ):
-    if current_user.id != user_id:
+    if principal.id != user_id:
         raise HTTPException(
             status_code=HTTPStatus.FORBIDDEN, detail='Not enough permissions'
         )
-    await session.delete(current_user)
+    db_user = await _own_user(session, principal)
+    await session.delete(db_user)
     await session.commit()
+    token_version_cache.invalidate(db_user.id)
+    principal_cache.invalidate(db_user.email)
 
     return {'message': 'User deleted'}
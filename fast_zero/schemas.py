@@ -1,8 +1,18 @@
 from datetime import datetime
+from typing import Annotated
 
-from pydantic import BaseModel, ConfigDict, EmailStr
+from pydantic import (
+    BaseModel,
+    BeforeValidator,
+    ConfigDict,
+    EmailStr,
+    model_validator,
+)
 
 from fast_zero.models import TodoState
+from fast_zero.pagination import decode_cursor
+
+Cursor = Annotated[int, BeforeValidator(decode_cursor)]
 
 
 class Message(BaseModel):
@@ -24,6 +34,7 @@ class UserPublic(BaseModel):
 
 class UserList(BaseModel):
     users: list[UserPublic]
+    next_cursor: str | None = None
 
 
 class Token(BaseModel):
@@ -34,6 +45,7 @@ class Token(BaseModel):
 class FilterPage(BaseModel):
     offset: int = 0
     limit: int = 100
+    cursor: Cursor | None = None
 
 
 class TodoSchema(BaseModel):
@@ -48,17 +60,68 @@ class TodoPublic(TodoSchema):
     updated_at: datetime
 
 
+class TodoBulk(BaseModel):
+    todos: list[TodoSchema]
+
+
 class TodoList(BaseModel):
     todos: list[TodoPublic]
+    next_cursor: str | None = None
+
+
+class ImportLineError(BaseModel):
+    line: int
+    errors: list[dict]
+
+
+class ImportChunk(BaseModel):
+    imported: int
+    errors: list[ImportLineError]
+
+
+class ImportReport(BaseModel):
+    imported: int
+    failed: int
+    chunks: list[ImportChunk]
+
+
+class TodoChanges(BaseModel):
+    todos: list[TodoPublic]
+    deleted: list[int]
+    cursor: datetime | None
 
 
-class FilterTodo(FilterPage):
+class FilterTodoFields(BaseModel):
     title: str | None = None
     description: str | None = None
     state: TodoState | None = None
 
 
-class TodoUpdate(FilterPage):
+class FilterTodo(FilterPage, FilterTodoFields):
+    pass
+
+
+class FilterTodoBulk(FilterTodoFields):
+    all: bool = False
+
+    @model_validator(mode='after')
+    def require_predicate(self):
+        if not (self.all or self.title or self.description or self.state):
+            raise ValueError(
+                'Pass at least one filter, or all=true to affect every todo'
+            )
+        return self
+
+
+class TodoStateUpdate(BaseModel):
+    state: TodoState
+
+
+class BulkResult(BaseModel):
+    count: int
+
+
+class TodoUpdate(BaseModel):
     title: str | None = None
     description: str | None = None
     state: TodoState | None = None
@@ -0,0 +1,37 @@
+from sqlalchemy import func, literal_column, select, table
+
+# Must match the expression indexed by the search migration
+TSVECTOR_CONFIG = literal_column("'simple'::regconfig")
+
+
+def _fts5_phrase(term: str):
+    return '"{}"'.format(term.replace('"', '""'))
+
+
+def text_match(column, term: str, *, backend: str, dialect: str):
+    """Build the WHERE clause for a title/description search.
+
+    `like` keeps substring semantics (served by pg_trgm GIN indexes on
+    Postgres); `fulltext` matches whole words through a tsvector GIN index
+    on Postgres or the FTS5 shadow table on SQLite.
+    """
+    if backend == 'fulltext' and dialect == 'postgresql':
+        return func.to_tsvector(TSVECTOR_CONFIG, column).op('@@')(
+            func.plainto_tsquery(TSVECTOR_CONFIG, term)
+        )
+
+    if backend == 'fulltext' and dialect == 'sqlite':
+        source_table = column.expression.table
+        fts_table = table(f'{source_table.name}_fts')
+        matching_rows = (
+            select(literal_column('rowid'))
+            .select_from(fts_table)
+            .where(
+                literal_column(fts_table.name).op('MATCH')(
+                    f'{column.key} : {_fts5_phrase(term)}'
+                )
+            )
+        )
+        return source_table.c.id.in_(matching_rows)
+
+    return column.contains(term)
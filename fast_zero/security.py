@@ -1,66 +1,270 @@
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from hashlib import sha256
 from http import HTTPStatus
+from time import time
 from zoneinfo import ZoneInfo
 
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
-from jwt import DecodeError, ExpiredSignatureError, decode, encode
+from jwt import (
+    ExpiredSignatureError,
+    InvalidTokenError,
+    decode,
+    encode,
+    get_unverified_header,
+)
 from pwdlib import PasswordHash
-from sqlalchemy import select
+from pwdlib.hashers.argon2 import Argon2Hasher
+from sqlalchemy import inspect, select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import lazyload, make_transient_to_detached
 
+from fast_zero.cache import TTLCache
 from fast_zero.database import get_session
+from fast_zero.hashing import HashingPool
+from fast_zero.instrumentation import timed
+from fast_zero.keys import KeySet
+from fast_zero.metrics import AUTH_FAILURES
 from fast_zero.models import User
+from fast_zero.ratelimit import LoginLimiter, MemoryBackend
 from fast_zero.settings import Settings
 
 settings = Settings()
 
 
-pwd_context = PasswordHash.recommended()
+# Hashes made with other parameters still verify and are upgraded on the
+# next successful login; `python -m fast_zero.calibrate` suggests values.
+pwd_context = PasswordHash((
+    Argon2Hasher(
+        time_cost=settings.ARGON2_TIME_COST,
+        memory_cost=settings.ARGON2_MEMORY_COST,
+        parallelism=settings.ARGON2_PARALLELISM,
+    ),
+))
+
+hashing_pool = HashingPool(
+    max_workers=settings.HASHING_MAX_WORKERS,
+    max_queue=settings.HASHING_MAX_QUEUE,
+)
+
+login_limiter = LoginLimiter(
+    MemoryBackend(maxsize=settings.LOGIN_RATE_LIMIT_MAX_KEYS),
+    ip_burst=settings.LOGIN_IP_BURST,
+    ip_per_minute=settings.LOGIN_IP_PER_MINUTE,
+    username_burst=settings.LOGIN_USERNAME_BURST,
+    username_per_minute=settings.LOGIN_USERNAME_PER_MINUTE,
+)
+
+# With JWKS_PATH set tokens are signed with the key set (kid header) and
+# SECRET_KEY/ALGORITHM are no longer used
+key_set = (
+    KeySet(settings.JWKS_PATH, reload_seconds=settings.JWKS_RELOAD_SECONDS)
+    if settings.JWKS_PATH
+    else None
+)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl='auth/token')
 
+# The authenticated principal is loaded without its todo collection; it is
+# only fetched if an endpoint really touches it (e.g. the delete cascade).
+PRINCIPAL_LOAD_OPTIONS = (lazyload(User.todos),)
 
-async def get_current_user(
-    session: AsyncSession = Depends(get_session),
-    token: str = Depends(oauth2_scheme),
-):
-    credentials_exception = HTTPException(
+# Resolved principals keyed by token subject. Entries are merged into the
+# request session without a query; users.py invalidates them on writes.
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAXSIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+# Current token version per user id, checked against the `ver` claim of
+# self-contained tokens; users.py invalidates entries when it bumps one.
+token_version_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAXSIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+)
+
+# Claims of tokens whose signature already checked out, keyed by the
+# key-set generation and the token digest, so a reload that drops a key
+# also drops its tokens; each entry expires with the token's own `exp`.
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_MAXSIZE, ttl=0)
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    id: int
+    email: str
+
+
+def decode_token(token: str) -> dict:
+    generation = key_set.generation() if key_set else 0
+    key = (generation, sha256(token.encode()).digest())
+    payload = token_cache.get(key)
+
+    if payload is None:
+        if key_set is None:
+            payload = decode(
+                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            )
+        else:
+            algorithm, verify_key = key_set.verification_key(
+                get_unverified_header(token).get('kid')
+            )
+            payload = decode(token, verify_key, algorithms=[algorithm])
+        ttl = payload.get('exp', 0) - time()
+        if ttl > 0:
+            token_cache.set(key, payload, ttl=ttl)
+
+    return payload
+
+
+def _reject(reason: str):
+    AUTH_FAILURES.labels(reason).inc()
+    return HTTPException(
         status_code=HTTPStatus.UNAUTHORIZED,
         detail='Could not validate credentials',
         headers={'WWW-Authenticate': 'Bearer'},
     )
 
+
+def _token_claims(token: str) -> dict:
     try:
-        payload = decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        subject_email = payload.get('sub')
+        with timed('jwt'):
+            payload = decode_token(token)
+    except ExpiredSignatureError:
+        raise _reject('expired_token')
 
-        if not subject_email:
-            raise credentials_exception
-    except DecodeError:
-        raise credentials_exception
+    # Also malformed headers (e.g. a non-string kid) and an alg that does
+    # not match the key, which are not DecodeErrors
+    except InvalidTokenError:
+        raise _reject('invalid_token')
 
-    except ExpiredSignatureError:
-        raise credentials_exception
+    if not payload.get('sub'):
+        raise _reject('invalid_token')
+
+    return payload
+
+
+def _detached_copy(user: User) -> User:
+    """Copy of `user`'s columns bound to no session, safe to share.
+
+    The loaded instance belongs to the request that loaded it: a rollback
+    there would expire it under every later request reading the cache.
+    """
+    copy = User(
+        username=user.username, email=user.email, password=user.password
+    )
+    for column in inspect(User).column_attrs:
+        setattr(copy, column.key, getattr(user, column.key))
+    make_transient_to_detached(copy)
+    return copy
+
+
+async def _load_user(session: AsyncSession, email: str):
+    cached_user = principal_cache.get(email)
 
+    if cached_user is not None:
+        return await session.merge(cached_user, load=False)
+
+    epoch = principal_cache.epoch
     user = await session.scalar(
-        select(User).where(User.email == subject_email)
+        select(User)
+        .options(*PRINCIPAL_LOAD_OPTIONS)
+        .where(User.email == email)
     )
 
+    if user:
+        principal_cache.set(email, _detached_copy(user), epoch=epoch)
+
+    return user
+
+
+async def _token_version(session: AsyncSession, user_id: int):
+    version = token_version_cache.get(user_id)
+
+    if version is None:
+        epoch = token_version_cache.epoch
+        version = await session.scalar(
+            select(User.token_version).where(User.id == user_id)
+        )
+        if version is not None:
+            token_version_cache.set(user_id, version, epoch=epoch)
+
+    return version
+
+
+async def _user_from_claims(session: AsyncSession, payload: dict):
+    with timed('principal'):
+        user = await _load_user(session, payload['sub'])
+
     if not user:
-        raise credentials_exception
+        raise _reject('unknown_user')
+
+    if payload.get('ver', user.token_version) != user.token_version:
+        raise _reject('revoked_token')
 
     return user
 
 
+async def get_current_user(
+    session: AsyncSession = Depends(get_session),
+    token: str = Depends(oauth2_scheme),
+):
+    return await _user_from_claims(session, _token_claims(token))
+
+
+async def get_current_principal(
+    session: AsyncSession = Depends(get_session),
+    token: str = Depends(oauth2_scheme),
+) -> Principal:
+    """Authorize from the token claims, loading the user only if needed.
+
+    Self-contained tokens (uid/ver claims) cost one cached version lookup;
+    older tokens fall back to `get_current_user`.
+    """
+    payload = _token_claims(token)
+
+    if 'uid' not in payload or 'ver' not in payload:
+        user = await _user_from_claims(session, payload)
+        return Principal(id=user.id, email=user.email)
+
+    with timed('principal'):
+        version = await _token_version(session, payload['uid'])
+
+    if version is None:
+        raise _reject('unknown_user')
+
+    if version != payload['ver']:
+        raise _reject('revoked_token')
+
+    return Principal(id=payload['uid'], email=payload['sub'])
+
+
+def token_claims(user: User) -> dict:
+    claims = {'sub': user.email}
+
+    if settings.ACCESS_TOKEN_SELF_CONTAINED:
+        claims.update(uid=user.id, ver=user.token_version)
+
+    return claims
+
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.now(tz=ZoneInfo('UTC')) + timedelta(
         minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
     )
     to_encode.update({'exp': expire})
+
+    if key_set is not None:
+        signing_key = key_set.signing_key()
+        return encode(
+            to_encode,
+            signing_key.key,
+            algorithm=signing_key.algorithm,
+            headers={'kid': signing_key.kid},
+        )
+
     encoded_jwt = encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
     )
@@ -68,9 +272,31 @@ def create_access_token(data: dict):
     return encoded_jwt
 
 
+def public_jwks():
+    return None if key_set is None else key_set.public_jwks()
+
+
 def get_password_hash(password: str):
     return pwd_context.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str):
     return pwd_context.verify(plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str):
+    with timed('argon2'):
+        return await hashing_pool.run(get_password_hash, password)
+
+
+def verify_and_update_password(plain_password: str, hashed_password: str):
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+):
+    with timed('argon2'):
+        return await hashing_pool.run(
+            verify_and_update_password, plain_password, hashed_password
+        )
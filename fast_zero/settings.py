@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -10,3 +12,58 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    # Also put the user id and token version in tokens (uid/ver claims) so
+    # todo endpoints can authorize without loading the user
+    ACCESS_TOKEN_SELF_CONTAINED: bool = False
+    # JWKS file with RS256/EdDSA keys; the first private key signs
+    JWKS_PATH: str | None = None
+    JWKS_RELOAD_SECONDS: float = 5
+
+    # Connections are per worker process: keep
+    # workers * (POOL_SIZE + MAX_OVERFLOW) below Postgres max_connections
+    # (e.g. 4 workers -> 10 + 5 each = 60 of the default 100). Behind
+    # PgBouncer in transaction mode set DATABASE_NULL_POOL instead.
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 5
+    DATABASE_POOL_TIMEOUT: float = 30
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+    DATABASE_NULL_POOL: bool = False
+
+    PRINCIPAL_CACHE_MAXSIZE: int = 1024
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30
+    TOKEN_CACHE_MAXSIZE: int = 4096
+
+    # Login attempts: every attempt spends an IP token and a username token,
+    # a successful one gets its username token back; excess attempts get
+    # 429 before any hashing
+    LOGIN_IP_BURST: int = 20
+    LOGIN_IP_PER_MINUTE: float = 10
+    LOGIN_USERNAME_BURST: int = 5
+    LOGIN_USERNAME_PER_MINUTE: float = 1
+    LOGIN_RATE_LIMIT_MAX_KEYS: int = 10_000
+
+    # Argon2id cost; the defaults match argon2-cffi's (RFC 9106 low-memory)
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 4
+
+    HASHING_MAX_WORKERS: int = 2
+    HASHING_MAX_QUEUE: int = 32
+
+    TODO_SEARCH_BACKEND: Literal['like', 'fulltext'] = 'like'
+    TODO_BULK_MAX_ITEMS: int = 1000
+    TODO_EXPORT_CHUNK_SIZE: int = 500
+    TODO_IMPORT_CHUNK_SIZE: int = 500
+    # /todos/changes re-sends this much history before the cursor; keep it
+    # above the longest transaction that writes todos
+    TODO_CHANGES_OVERLAP_SECONDS: float = 5
+
+    COMPRESSION_MINIMUM_SIZE: int = 500
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+
+    # Log every statement slower than the threshold (fast_zero.requests)
+    SLOW_QUERY_LOG: bool = False
+    SLOW_QUERY_THRESHOLD_MS: float = 200
@@ -27,8 +27,22 @@ target_metadata = table_registry.metadata
 # my_important_option = config.get_main_option("my_important_option")
 # ... etc.
 
+# Search structures created by hand in the add_todos_search_indexes
+# revision; they are not part of the metadata, so autogenerate skips them.
+def include_name(name, type_, parent_names):
+    if type_ == 'table':
+        return not name.startswith('todos_fts')
+    if type_ == 'index':
+        return not name.endswith(('_trgm', '_tsv'))
+    return True
+
+
 def do_run_migrations(connection):
-    context.configure(connection=connection, target_metadata=target_metadata) 
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
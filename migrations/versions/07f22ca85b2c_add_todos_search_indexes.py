@@ -0,0 +1,78 @@
+"""add todos search indexes
+
+Revision ID: 07f22ca85b2c
+Revises: b6cd5cb1ad6a
+Create Date: 2026-10-18 04:41:12.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '07f22ca85b2c'
+down_revision: Union[str, None] = 'b6cd5cb1ad6a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = ('title', 'description')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+        with op.get_context().autocommit_block():
+            for column in SEARCH_COLUMNS:
+                op.execute(
+                    f'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_todos_{column}_trgm '
+                    f'ON todos USING gin ({column} gin_trgm_ops)'
+                )
+                op.execute(
+                    f'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_todos_{column}_tsv '
+                    f"ON todos USING gin (to_tsvector('simple'::regconfig, {column}))"
+                )
+
+    elif dialect == 'sqlite':
+        op.execute(
+            'CREATE VIRTUAL TABLE todos_fts USING fts5('
+            "title, description, content='todos', content_rowid='id')"
+        )
+        op.execute(
+            'CREATE TRIGGER todos_fts_insert AFTER INSERT ON todos BEGIN '
+            'INSERT INTO todos_fts(rowid, title, description) '
+            'VALUES (new.id, new.title, new.description); END'
+        )
+        op.execute(
+            'CREATE TRIGGER todos_fts_delete AFTER DELETE ON todos BEGIN '
+            'INSERT INTO todos_fts(todos_fts, rowid, title, description) '
+            "VALUES ('delete', old.id, old.title, old.description); END"
+        )
+        op.execute(
+            'CREATE TRIGGER todos_fts_update AFTER UPDATE ON todos BEGIN '
+            'INSERT INTO todos_fts(todos_fts, rowid, title, description) '
+            "VALUES ('delete', old.id, old.title, old.description); "
+            'INSERT INTO todos_fts(rowid, title, description) '
+            'VALUES (new.id, new.title, new.description); END'
+        )
+        op.execute("INSERT INTO todos_fts(todos_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            for column in SEARCH_COLUMNS:
+                op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS ix_todos_{column}_tsv')
+                op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS ix_todos_{column}_trgm')
+
+    elif dialect == 'sqlite':
+        for trigger in ('insert', 'delete', 'update'):
+            op.execute(f'DROP TRIGGER IF EXISTS todos_fts_{trigger}')
+        op.execute('DROP TABLE IF EXISTS todos_fts')
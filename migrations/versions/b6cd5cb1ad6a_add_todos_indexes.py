@@ -0,0 +1,34 @@
+"""add todos indexes
+
+Revision ID: b6cd5cb1ad6a
+Revises: f42ac3f9c185
+Create Date: 2026-10-18 04:25:48.703323
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6cd5cb1ad6a'
+down_revision: Union[str, None] = 'f42ac3f9c185'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    with op.get_context().autocommit_block():
+        op.create_index('ix_todos_user_id_id', 'todos', ['user_id', 'id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_todos_user_id_state', 'todos', ['user_id', 'state'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_todos_user_id_updated_at', 'todos', ['user_id', 'updated_at'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_todos_user_id_updated_at', table_name='todos', postgresql_concurrently=True)
+        op.drop_index('ix_todos_user_id_state', table_name='todos', postgresql_concurrently=True)
+        op.drop_index('ix_todos_user_id_id', table_name='todos', postgresql_concurrently=True)
@@ -1,5 +1,6 @@
 from contextlib import contextmanager
 from datetime import datetime
+from functools import partial
 
 import factory
 import factory.fuzzy
@@ -11,9 +12,15 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from testcontainers.postgres import PostgresContainer
 
 from fast_zero.app import app
-from fast_zero.database import get_session
+from fast_zero.database import get_session, sql_timer
 from fast_zero.models import Todo, TodoState, User, table_registry
-from fast_zero.security import get_password_hash
+from fast_zero.security import (
+    get_password_hash,
+    login_limiter,
+    principal_cache,
+    token_cache,
+    token_version_cache,
+)
 
 
 @contextmanager
@@ -31,6 +38,28 @@ def _mock_db_time(*, model, time=datetime(2025, 1, 1)):
     event.remove(model, 'before_insert', fake_time_hook)
 
 
+@contextmanager
+def _count_queries(*, engine):
+    queries = []
+
+    def count_hook(conn, cursor, statement, *args):
+        queries.append((statement, max(cursor.rowcount, 0)))
+
+    event.listen(engine.sync_engine, 'after_cursor_execute', count_hook)
+
+    yield queries
+
+    event.remove(engine.sync_engine, 'after_cursor_execute', count_hook)
+
+
+@pytest.fixture(autouse=True)
+def _clear_auth_caches():
+    login_limiter.reset()
+    principal_cache.clear()
+    token_cache.clear()
+    token_version_cache.clear()
+
+
 @pytest.fixture
 def client(session):
     def get_session_override():
@@ -43,15 +72,42 @@ def client(session):
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def isolated_client(session, engine):
+    """Client opening a session per request, like the app itself.
+
+    `client` shares the test session across requests, which hides bugs
+    with objects outliving their session.
+    """
+
+    async def get_session_override():
+        async with AsyncSession(
+            engine, expire_on_commit=False
+        ) as request_session:
+            yield request_session
+
+    with TestClient(app) as client:
+        app.dependency_overrides[get_session] = get_session_override
+        yield client
+
+    app.dependency_overrides.clear()
+
+
 @pytest.fixture
 def mock_db_time():
     return _mock_db_time
 
 
+@pytest.fixture
+def count_queries(engine):
+    return partial(_count_queries, engine=engine)
+
+
 @pytest.fixture(scope='session')
 def engine():
     with PostgresContainer('postgres:16', driver='psycopg') as postgres:
         _engine = create_async_engine(postgres.get_connection_url())
+        sql_timer.install(_engine.sync_engine)
         yield _engine
 
 
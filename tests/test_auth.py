@@ -1,6 +1,11 @@
 from http import HTTPStatus
 
+import pytest
 from freezegun import freeze_time
+from pwdlib import PasswordHash
+from pwdlib.hashers.argon2 import Argon2Hasher
+
+from fast_zero import security
 
 
 def test_get_token(client, user):
@@ -107,3 +112,58 @@ def test_token_expired_dont_refresh(client, user):
             assert response.json() == {
                 'detail': 'Could not validate credentials'
             }
+
+
+def test_login_rate_limited_before_lookup_and_hashing(
+    client, user, count_queries, monkeypatch
+):
+    verified = []
+
+    def counting_verify(*args):
+        verified.append(args)
+        return False, None
+
+    monkeypatch.setattr(
+        security, 'verify_and_update_password', counting_verify
+    )
+    username_burst, _ = security.login_limiter.username_limit
+    data = {'username': user.email, 'password': 'wrong'}
+
+    for _ in range(username_burst):
+        client.post('/auth/token', data=data)
+
+    with count_queries() as queries:
+        response = client.post('/auth/token', data=data)
+
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert int(response.headers['retry-after']) > 0
+    assert not queries
+    assert len(verified) == username_burst
+
+
+def test_successful_logins_do_not_spend_username_tokens(client, user):
+    username_burst, _ = security.login_limiter.username_limit
+    data = {'username': user.email, 'password': user.clean_password}
+
+    for _ in range(username_burst + 1):
+        response = client.post('/auth/token', data=data)
+
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.asyncio
+async def test_login_upgrades_outdated_hash(client, session, user):
+    user.password = PasswordHash((Argon2Hasher(time_cost=1),)).hash(
+        user.clean_password
+    )
+    await session.commit()
+
+    response = client.post(
+        '/auth/token',
+        data={'username': user.email, 'password': user.clean_password},
+    )
+    await session.refresh(user)
+
+    assert response.status_code == HTTPStatus.OK
+    assert f't={security.settings.ARGON2_TIME_COST},' in user.password
+    assert security.verify_password(user.clean_password, user.password)
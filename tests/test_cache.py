@@ -0,0 +1,56 @@
+from freezegun import freeze_time
+
+from fast_zero.cache import TTLCache
+
+
+def test_cache_hit_and_miss():
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set('key', 'value')
+
+    assert cache.get('key') == 'value'
+    assert cache.get('other') is None
+    assert cache.hits == 1
+    assert cache.misses == 1
+
+
+def test_cache_entry_expires():
+    cache = TTLCache(maxsize=2, ttl=10)
+
+    with freeze_time('2025-01-01 12:00:00') as frozen_time:
+        cache.set('key', 'value')
+        frozen_time.tick(11)
+
+        assert cache.get('key') is None
+        assert len(cache) == 0
+
+
+def test_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set('a', 'a')
+    cache.set('b', 'b')
+    cache.get('a')
+    cache.set('c', 'c')
+
+    assert cache.get('a') == 'a'
+    assert cache.get('b') is None
+    assert cache.get('c') == 'c'
+
+
+def test_cache_invalidate():
+    cache = TTLCache(maxsize=2, ttl=10)
+    cache.set('key', 'value')
+    cache.invalidate('key')
+
+    assert cache.get('key') is None
+
+
+def test_cache_set_skipped_after_invalidation():
+    cache = TTLCache(maxsize=2, ttl=10)
+    epoch = cache.epoch
+
+    cache.invalidate('key')
+    cache.set('key', 'stale', epoch=epoch)
+    cache.set('other', 'fresh', epoch=cache.epoch)
+
+    assert cache.get('key') is None
+    assert cache.get('other') == 'fresh'
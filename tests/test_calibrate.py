@@ -0,0 +1,57 @@
+from types import SimpleNamespace
+
+import pytest
+
+from fast_zero import calibrate
+
+
+@pytest.fixture
+def fake_hasher(monkeypatch):
+    # 10 ms per pass over 8 MiB
+    monkeypatch.setattr(calibrate, 'Argon2Hasher', SimpleNamespace)
+    monkeypatch.setattr(
+        calibrate,
+        'measure_ms',
+        lambda hasher, rounds: (
+            10 * hasher.time_cost * hasher.memory_cost / 8192
+        ),
+    )
+
+
+@pytest.mark.usefixtures('fake_hasher')
+def test_calibrate_lowers_memory_when_one_pass_is_too_slow():
+    expected_memory_cost = 32768
+
+    result = calibrate.calibrate(target_ms=50, memory_cost=65536)
+
+    assert result['ARGON2_TIME_COST'] == 1
+    assert result['ARGON2_MEMORY_COST'] == expected_memory_cost
+
+
+@pytest.mark.usefixtures('fake_hasher')
+def test_calibrate_adds_passes_to_reach_target():
+    target_ms = 50
+    expected_time_cost = 5
+
+    result = calibrate.calibrate(target_ms=target_ms, memory_cost=8192)
+
+    assert result['ARGON2_TIME_COST'] == expected_time_cost
+    assert result['elapsed_ms'] == target_ms
+
+
+@pytest.mark.usefixtures('fake_hasher')
+def test_calibrate_main_prints_settings(capsys):
+    calibrate.main(['--target-ms', '50', '--memory-cost', '8192'])
+
+    output = capsys.readouterr().out
+    assert 'ARGON2_TIME_COST=5' in output
+    assert 'ARGON2_MEMORY_COST=8192' in output
+    assert 'ARGON2_PARALLELISM=4' in output
+
+
+def test_measure_ms_hashes():
+    hasher = calibrate.Argon2Hasher(
+        time_cost=1, memory_cost=calibrate.MIN_MEMORY_COST, parallelism=1
+    )
+
+    assert calibrate.measure_ms(hasher, rounds=1) > 0
@@ -0,0 +1,87 @@
+import gzip
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from fast_zero.compression import (
+    CompressionMiddleware,
+    negotiate_encoding,
+    skip_compression,
+)
+
+PAYLOAD = 'todo ' * 500
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+
+@app.get('/large', response_class=PlainTextResponse)
+def large():
+    return PAYLOAD
+
+
+@app.get('/small', response_class=PlainTextResponse)
+def small():
+    return 'todo'
+
+
+@app.get('/stream')
+def stream():
+    return StreamingResponse(iter([PAYLOAD, PAYLOAD]), media_type='text/plain')
+
+
+@app.get('/raw', response_class=PlainTextResponse)
+@skip_compression
+def raw():
+    return PAYLOAD
+
+
+def _get(path):
+    client = TestClient(app)
+    return client.get(path, headers={'Accept-Encoding': 'gzip'})
+
+
+def test_large_response_is_compressed():
+    response = _get('/large')
+
+    assert response.headers['content-encoding'] == 'gzip'
+    assert int(response.headers['content-length']) < len(PAYLOAD)
+    assert response.text == PAYLOAD
+
+
+def test_small_response_is_not_compressed():
+    response = _get('/small')
+
+    assert 'content-encoding' not in response.headers
+
+
+def test_streaming_response_is_compressed_incrementally():
+    response = _get('/stream')
+
+    assert response.headers['content-encoding'] == 'gzip'
+    assert 'content-length' not in response.headers
+    assert response.text == PAYLOAD * 2
+
+
+def test_route_can_opt_out():
+    response = _get('/raw')
+
+    assert 'content-encoding' not in response.headers
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding('gzip, deflate') == 'gzip'
+    assert negotiate_encoding('gzip;q=0') is None
+    assert negotiate_encoding('identity') is None
+
+
+def test_gzip_stream_is_valid():
+    client = TestClient(app)
+
+    with client.stream(
+        'GET', '/stream', headers={'Accept-Encoding': 'gzip'}
+    ) as response:
+        raw = b''.join(response.iter_raw())
+
+    assert gzip.decompress(raw).decode() == PAYLOAD * 2
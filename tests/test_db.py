@@ -1,9 +1,19 @@
 from dataclasses import asdict
+from datetime import datetime
 
 import pytest
-from sqlalchemy import select
+from prometheus_client import REGISTRY
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 
+from fast_zero.database import TimedQueuePool, engine_options
 from fast_zero.models import Todo, User
+from fast_zero.pagination import encode_cursor, paginate
+from fast_zero.routers.todos import TODO_PUBLIC_COLUMNS
+from fast_zero.schemas import FilterTodo
+from fast_zero.settings import Settings
 
 
 @pytest.mark.asyncio
@@ -24,6 +34,7 @@ async def test_create_user(session, mock_db_time):
         'email': 'lucas@exemplo.com',
         'created_at': time,
         'updated_at': time,
+        'token_version': 0,
         'todos': [],
     }
 
@@ -69,3 +80,118 @@ async def test_user_todo_relationship(session, user: User):
     user = await session.scalar(select(User).where(User.id == user.id))
 
     assert user.todos == [todo]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ('query', 'index'),
+    [
+        (
+            select(Todo).where(Todo.user_id == 1, Todo.state == 'done'),
+            'ix_todos_user_id_state',
+        ),
+        (
+            select(Todo).where(Todo.user_id == 1).order_by(Todo.id).limit(10),
+            'ix_todos_user_id_id',
+        ),
+        (
+            select(Todo).where(
+                Todo.user_id == 1, Todo.updated_at > datetime(2025, 1, 1)
+            ),
+            'ix_todos_user_id_updated_at',
+        ),
+    ],
+)
+async def test_todo_queries_use_indexes(session, query, index):
+    # The test tables are tiny, so force the planner off its cheap plans
+    for setting in ('enable_seqscan', 'enable_bitmapscan', 'enable_sort'):
+        await session.execute(text(f'SET {setting} = off'))
+    compiled = query.compile(
+        dialect=postgresql.dialect(), compile_kwargs={'literal_binds': True}
+    )
+
+    plan = await session.scalars(text(f'EXPLAIN {compiled}'))
+
+    assert index in '\n'.join(plan.all())
+
+
+@pytest.mark.asyncio
+async def test_todo_cursor_page_is_an_index_range_scan(session):
+    for setting in ('enable_seqscan', 'enable_bitmapscan', 'enable_sort'):
+        await session.execute(text(f'SET {setting} = off'))
+    query = paginate(
+        select(*TODO_PUBLIC_COLUMNS).where(Todo.user_id == 1),
+        FilterTodo(cursor=encode_cursor(10_000), limit=10),
+        Todo.id,
+    )
+    compiled = str(
+        query.compile(
+            dialect=postgresql.dialect(),
+            compile_kwargs={'literal_binds': True},
+        )
+    )
+
+    plan = await session.scalars(text(f'EXPLAIN {compiled}'))
+
+    assert 'OFFSET' not in compiled
+    assert 'ix_todos_user_id_id' in '\n'.join(plan.all())
+
+
+def test_engine_options_queue_pool():
+    settings = Settings(
+        DATABASE_URL='postgresql+psycopg://app@localhost/app',
+        DATABASE_POOL_SIZE=3,
+    )
+
+    options = engine_options(settings)
+
+    assert options['poolclass'] is TimedQueuePool
+    assert options['pool_size'] == settings.DATABASE_POOL_SIZE
+
+
+def test_engine_options_null_pool():
+    settings = Settings(
+        DATABASE_URL='postgresql+psycopg://app@localhost/app',
+        DATABASE_NULL_POOL=True,
+    )
+
+    options = engine_options(settings)
+
+    assert options['poolclass'] is NullPool
+    assert 'pool_size' not in options
+
+
+@pytest.mark.asyncio
+async def test_timed_queue_pool_records_wait(engine):
+    url = engine.url.render_as_string(hide_password=False)
+    pooled_engine = create_async_engine(
+        url, **engine_options(Settings(DATABASE_URL=url))
+    )
+    waits_before = REGISTRY.get_sample_value('db_pool_wait_seconds_count')
+
+    async with pooled_engine.connect() as conn:
+        await conn.execute(text('SELECT 1'))
+    await pooled_engine.dispose()
+
+    waits = REGISTRY.get_sample_value('db_pool_wait_seconds_count')
+    assert waits == waits_before + 1
+
+
+@pytest.mark.asyncio
+async def test_timed_queue_pool_reports_overflow(engine):
+    url = engine.url.render_as_string(hide_password=False)
+    pooled_engine = create_async_engine(
+        url,
+        **engine_options(
+            Settings(
+                DATABASE_URL=url, DATABASE_POOL_SIZE=1, DATABASE_MAX_OVERFLOW=1
+            )
+        ),
+    )
+
+    async with pooled_engine.connect(), pooled_engine.connect():
+        overflow = REGISTRY.get_sample_value('db_pool_overflow')
+    await pooled_engine.dispose()
+
+    assert overflow == 1
+    assert REGISTRY.get_sample_value('db_pool_overflow') == 0
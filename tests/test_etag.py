@@ -0,0 +1,26 @@
+from starlette.requests import Request
+
+from fast_zero.etag import etag_matches, make_etag
+
+
+def _request(if_none_match):
+    return Request({
+        'type': 'http',
+        'headers': [(b'if-none-match', if_none_match.encode())],
+    })
+
+
+def test_make_etag_is_weak_and_stable():
+    etag = make_etag(1, 'a')
+
+    assert etag.startswith('W/"')
+    assert etag == make_etag(1, 'a')
+    assert etag != make_etag(1, 'b')
+
+
+def test_etag_matches_weak_comparison():
+    etag = make_etag(1)
+
+    assert etag_matches(_request(f'"other", {etag.removeprefix("W/")}'), etag)
+    assert etag_matches(_request('*'), etag)
+    assert not etag_matches(_request('"other"'), etag)
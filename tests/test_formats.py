@@ -0,0 +1,64 @@
+import pytest
+
+from fast_zero.formats import iter_lines, parse_todos
+
+
+async def _stream(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_joins_split_chunks():
+    lines = [line async for line in iter_lines(_stream(b'ab', b'c\nd', b'e'))]
+
+    assert lines == [(1, b'abc'), (2, b'de')]
+
+
+@pytest.mark.asyncio
+async def test_parse_todos_csv_reports_bad_lines():
+    bad_line = 3
+    body = _stream(b'title,description,state\n', b'x,y,todo\nx,y,wrong\n')
+
+    records = [record async for record in parse_todos(body, 'csv')]
+
+    assert records[0][1].title == 'x'
+    assert records[1][0] == bad_line
+    assert records[1][2][0]['loc'] == ('state',)
+
+
+@pytest.mark.asyncio
+async def test_parse_todos_csv_keeps_quoted_newlines():
+    body = _stream(
+        b'title,description,state\n',
+        b'x,"first\nsecond ""q""",todo\n',
+        b'y,z,done\n',
+    )
+
+    records = [record async for record in parse_todos(body, 'csv')]
+
+    assert [line for line, _, _ in records] == [2, 4]
+    assert records[0][1].description == 'first\nsecond "q"'
+    assert records[1][1].title == 'y'
+
+
+@pytest.mark.asyncio
+async def test_parse_todos_csv_rejects_wrong_field_count():
+    body = _stream(
+        b'title,description,state\n', b'x,todo\n', b'x,y,todo,extra\n'
+    )
+
+    records = [record async for record in parse_todos(body, 'csv')]
+
+    assert [todo for _, todo, _ in records] == [None, None]
+    assert records[0][2][0]['msg'] == 'Expected 3 fields, got 2'
+    assert records[1][2][0]['msg'] == 'Expected 3 fields, got 4'
+
+
+@pytest.mark.asyncio
+async def test_parse_todos_csv_reports_unterminated_quote():
+    body = _stream(b'title,description,state\n', b'x,"open,todo\n')
+
+    records = [record async for record in parse_todos(body, 'csv')]
+
+    assert records[0][2][0]['msg'] == 'Unterminated quoted field'
@@ -0,0 +1,49 @@
+import asyncio
+from http import HTTPStatus
+from threading import Event
+
+import pytest
+from fastapi import HTTPException
+from prometheus_client import REGISTRY
+
+from fast_zero.hashing import HashingPool
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_runs_function():
+    pool = HashingPool(max_workers=1, max_queue=0)
+    completed_before = REGISTRY.get_sample_value(
+        'hashing_duration_seconds_count'
+    )
+
+    result = await pool.run(str.upper, 'secret')
+
+    assert result == 'SECRET'
+    assert pool.pending == 0
+    assert (
+        REGISTRY.get_sample_value('hashing_duration_seconds_count')
+        == completed_before + 1
+    )
+
+
+@pytest.mark.asyncio
+async def test_hashing_pool_rejects_when_saturated():
+    pool = HashingPool(max_workers=1, max_queue=1)
+    release = Event()
+    rejected_before = REGISTRY.get_sample_value('hashing_rejected_total')
+
+    running = asyncio.gather(pool.run(release.wait), pool.run(release.wait))
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await pool.run(release.wait)
+
+    release.set()
+    await running
+
+    assert exc_info.value.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert pool.pending == 0
+    assert (
+        REGISTRY.get_sample_value('hashing_rejected_total')
+        == rejected_before + 1
+    )
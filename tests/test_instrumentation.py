@@ -0,0 +1,75 @@
+import logging
+from http import HTTPStatus
+from types import SimpleNamespace
+
+from fast_zero.instrumentation import (
+    RequestMetrics,
+    SQLTimer,
+    current_metrics,
+    timed,
+)
+
+
+def test_server_timing_header(client, token, todo):
+    response = client.get(
+        '/todos/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    server_timing = response.headers['server-timing']
+
+    assert server_timing.startswith('sql;dur=')
+    assert 'queries' in server_timing
+    assert 'jwt;dur=' in server_timing
+    assert 'principal;dur=' in server_timing
+    assert 'serialize;dur=' in server_timing
+    assert 'total;dur=' in server_timing
+
+
+def test_request_is_logged(client, token, caplog):
+    with caplog.at_level(logging.INFO, logger='fast_zero.requests'):
+        client.get('/todos/', headers={'Authorization': f'Bearer {token}'})
+
+    (record,) = [r for r in caplog.records if r.name == 'fast_zero.requests']
+    assert record.method == 'GET'
+    assert record.path == '/todos/'
+    assert record.status_code == HTTPStatus.OK
+    assert record.sql_count >= 1
+    assert 'jwt' in record.timings_ms
+
+
+def test_sql_timer_records_into_current_request(caplog):
+    expected_rows = 3
+    sql_timer = SQLTimer(slow_query_ms=0)
+    conn = SimpleNamespace(info={})
+    cursor = SimpleNamespace(rowcount=expected_rows)
+    metrics = RequestMetrics()
+    token = current_metrics.set(metrics)
+
+    with caplog.at_level(logging.WARNING, logger='fast_zero.requests'):
+        sql_timer.before_cursor_execute(conn, cursor, 'SELECT 1')
+        sql_timer.after_cursor_execute(conn, cursor, 'SELECT 1')
+
+    current_metrics.reset(token)
+
+    assert metrics.sql_count == 1
+    assert metrics.sql_rows == expected_rows
+    assert caplog.records[0].statement == 'SELECT 1'
+
+
+def test_slow_query_log_disabled_by_default(caplog):
+    sql_timer = SQLTimer()
+    conn = SimpleNamespace(info={})
+    cursor = SimpleNamespace(rowcount=-1)
+
+    with caplog.at_level(logging.WARNING, logger='fast_zero.requests'):
+        sql_timer.before_cursor_execute(conn, cursor, 'SELECT 1')
+        sql_timer.after_cursor_execute(conn, cursor, 'SELECT 1')
+
+    assert not caplog.records
+
+
+def test_timed_outside_request_is_noop():
+    with timed('jwt'):
+        pass
+
+    assert current_metrics.get() is None
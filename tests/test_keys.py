@@ -0,0 +1,166 @@
+import json
+import os
+from base64 import urlsafe_b64encode
+from http import HTTPStatus
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from jwt import encode, get_unverified_header
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+
+from fast_zero import security
+from fast_zero.keys import KeySet
+
+
+def _jwk(kid, algorithm):
+    if algorithm == 'EdDSA':
+        jwk = OKPAlgorithm.to_jwk(
+            ed25519.Ed25519PrivateKey.generate(), as_dict=True
+        )
+    else:
+        jwk = RSAAlgorithm.to_jwk(
+            rsa.generate_private_key(public_exponent=65537, key_size=2048),
+            as_dict=True,
+        )
+    return {**jwk, 'kid': kid}
+
+
+def _write_jwks(path, *jwks):
+    path.write_text(json.dumps({'keys': list(jwks)}))
+    # Make the rewrite visible even on coarse mtime filesystems
+    mtime = path.stat().st_mtime_ns + 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+
+
+@pytest.fixture
+def jwks_path(tmp_path):
+    path = tmp_path / 'jwks.json'
+    _write_jwks(path, _jwk('key-1', 'EdDSA'))
+    return path
+
+
+@pytest.fixture
+def key_set(jwks_path, monkeypatch):
+    key_set = KeySet(jwks_path, reload_seconds=0)
+    monkeypatch.setattr(security, 'key_set', key_set)
+    return key_set
+
+
+@pytest.mark.parametrize('algorithm', ['EdDSA', 'RS256'])
+def test_token_signed_with_key_set(
+    client, user, tmp_path, monkeypatch, algorithm
+):
+    path = tmp_path / 'jwks.json'
+    _write_jwks(path, _jwk('key-1', algorithm))
+    monkeypatch.setattr(security, 'key_set', KeySet(path))
+
+    response = client.post(
+        '/auth/token',
+        data={'username': user.email, 'password': user.clean_password},
+    )
+    token = response.json()['access_token']
+
+    assert get_unverified_header(token) == {
+        'alg': algorithm,
+        'kid': 'key-1',
+        'typ': 'JWT',
+    }
+    response = client.get(
+        '/todos/', headers={'Authorization': f'Bearer {token}'}
+    )
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_key_set_parsed_once(key_set, user):
+    for _ in range(3):
+        security.decode_token(
+            security.create_access_token({'sub': user.email})
+        )
+
+    assert key_set.loads == 1
+
+
+def test_key_rotation_without_restart(client, user, key_set, jwks_path):
+    old_token = security.create_access_token({'sub': user.email})
+    old_jwk = json.loads(jwks_path.read_text())['keys'][0]
+
+    _write_jwks(jwks_path, _jwk('key-2', 'EdDSA'), old_jwk)
+    new_token = security.create_access_token({'sub': user.email})
+
+    assert get_unverified_header(new_token)['kid'] == 'key-2'
+    for token in (old_token, new_token):
+        response = client.get(
+            '/todos/', headers={'Authorization': f'Bearer {token}'}
+        )
+        assert response.status_code == HTTPStatus.OK
+
+
+def test_unknown_kid_is_rejected(client, user, key_set, jwks_path):
+    token = security.create_access_token({'sub': user.email})
+    _write_jwks(jwks_path, _jwk('key-2', 'EdDSA'))
+
+    response = client.get(
+        '/todos/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_cached_token_rejected_once_its_kid_is_removed(
+    client, user, key_set, jwks_path
+):
+    token = security.create_access_token({'sub': user.email})
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/todos/', headers=headers)
+    _write_jwks(jwks_path, _jwk('key-2', 'EdDSA'))
+
+    response = client.get('/todos/', headers=headers)
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def _segment(data):
+    return urlsafe_b64encode(json.dumps(data).encode()).rstrip(b'=').decode()
+
+
+def test_non_string_kid_is_rejected(client, user, key_set):
+    header = _segment({'alg': 'EdDSA', 'kid': 123, 'typ': 'JWT'})
+    token = f'{header}.{_segment({"sub": user.email})}.c2ln'
+
+    response = client.get(
+        '/todos/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_alg_not_matching_the_key_is_rejected(client, user, key_set):
+    # key-1 is an EdDSA key
+    token = encode(
+        {'sub': user.email},
+        rsa.generate_private_key(public_exponent=65537, key_size=2048),
+        algorithm='RS256',
+        headers={'kid': 'key-1'},
+    )
+
+    response = client.get(
+        '/todos/', headers={'Authorization': f'Bearer {token}'}
+    )
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_jwks_endpoint_publishes_public_keys(client, key_set):
+    response = client.get('/auth/jwks')
+
+    (jwk,) = response.json()['keys']
+    assert response.status_code == HTTPStatus.OK
+    assert jwk['kid'] == 'key-1'
+    assert jwk['alg'] == 'EdDSA'
+    assert 'd' not in jwk
+
+
+def test_jwks_endpoint_without_key_set(client):
+    response = client.get('/auth/jwks')
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,78 @@
+import os
+from http import HTTPStatus
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from fast_zero.app import app
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_metrics_endpoint(client):
+    client.get('/')
+
+    response = client.get('/metrics')
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'].startswith('text/plain')
+    assert 'http_request_duration_seconds_bucket' in response.text
+    assert 'http_requests_in_flight' in response.text
+    assert 'db_pool_checked_out' in response.text
+    assert 'hashing_pending' in response.text
+
+
+@pytest.mark.asyncio
+async def test_latency_is_labelled_by_route_template(
+    session, client, user, token, todo
+):
+    todo = todo.create(user_id=user.id)
+    session.add(todo)
+    await session.commit()
+    labels = {'method': 'PATCH', 'route': '/todos/{todo_id}', 'status': '200'}
+    before = _sample('http_request_duration_seconds_count', **labels)
+
+    client.patch(
+        f'/todos/{todo.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'title': 'metrics'},
+    )
+
+    after = _sample('http_request_duration_seconds_count', **labels)
+    assert after == before + 1
+    assert (
+        _sample(
+            'http_request_duration_seconds_count',
+            method='PATCH',
+            route=f'/todos/{todo.id}',
+            status='200',
+        )
+        == 0
+    )
+
+
+def test_auth_failures_are_counted(client):
+    before = _sample('auth_failures_total', reason='invalid_token')
+
+    client.get('/todos/', headers={'Authorization': 'Bearer invalid'})
+
+    assert _sample('auth_failures_total', reason='invalid_token') == before + 1
+
+
+def test_worker_drops_live_gauges_on_shutdown(tmp_path, monkeypatch):
+    monkeypatch.setenv('PROMETHEUS_MULTIPROC_DIR', str(tmp_path))
+    live_gauges = tmp_path / f'gauge_livesum_{os.getpid()}.db'
+    other_worker = tmp_path / f'gauge_livesum_{os.getpid() + 1}.db'
+    counters = tmp_path / f'counter_{os.getpid()}.db'
+    for path in (live_gauges, other_worker, counters):
+        path.touch()
+
+    with TestClient(app):
+        pass
+
+    assert not live_gauges.exists()
+    assert other_worker.exists()
+    assert counters.exists()
@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from freezegun import freeze_time
+
+from fast_zero.ratelimit import LoginLimiter, MemoryBackend
+
+
+def test_bucket_allows_burst_then_refills():
+    backend = MemoryBackend(maxsize=10)
+    burst = 3
+
+    with freeze_time('2025-01-01 12:00:00') as frozen:
+        assert all(
+            backend.take('key', burst, per_second=1) == 0 for _ in range(burst)
+        )
+        assert backend.take('key', burst, per_second=1) == 1
+
+        frozen.tick(timedelta(seconds=1))
+
+        assert backend.take('key', burst, per_second=1) == 0
+
+
+def test_refund_returns_a_token_up_to_capacity():
+    backend = MemoryBackend(maxsize=10)
+
+    with freeze_time('2025-01-01 12:00:00'):
+        backend.take('key', 1, per_second=1)
+        backend.refund('key', 1, per_second=1)
+        backend.refund('key', 1, per_second=1)
+
+        assert backend.take('key', 1, per_second=1) == 0
+        assert backend.take('key', 1, per_second=1) > 0
+
+
+def test_backend_drops_least_recently_used_keys():
+    backend = MemoryBackend(maxsize=2)
+
+    for key in ('a', 'b', 'c'):
+        backend.take(key, 1, per_second=1)
+
+    assert backend.take('a', 1, per_second=1) == 0
+    assert backend.take('c', 1, per_second=1) > 0
+
+
+def _limiter():
+    return LoginLimiter(
+        MemoryBackend(maxsize=10),
+        ip_burst=10,
+        ip_per_minute=1,
+        username_burst=1,
+        username_per_minute=1,
+    )
+
+
+def test_check_spends_username_token():
+    limiter = _limiter()
+
+    assert limiter.check('1.2.3.4', 'user@x.com') == 0
+    assert limiter.check('5.6.7.8', ' USER@x.com ') > 0
+
+
+def test_success_refunds_username_token():
+    limiter = _limiter()
+
+    assert limiter.check('1.2.3.4', 'user@x.com') == 0
+    limiter.succeeded(' USER@x.com ')
+
+    assert limiter.check('5.6.7.8', 'user@x.com') == 0
@@ -0,0 +1,24 @@
+from datetime import datetime
+from types import SimpleNamespace
+
+from fast_zero.responses import ModelResponse
+from fast_zero.schemas import TodoList
+
+
+def test_model_response_matches_model_dump():
+    todo = SimpleNamespace(
+        id=1,
+        title='title',
+        description='description',
+        state='draft',
+        created_at=datetime(2025, 1, 1),
+        updated_at=datetime(2025, 1, 1),
+    )
+    content = {'todos': [todo], 'next_cursor': None}
+
+    response = ModelResponse(TodoList, content, headers={'ETag': 'W/"1"'})
+
+    expected = TodoList.model_validate(content, from_attributes=True)
+    assert response.body == expected.model_dump_json().encode()
+    assert response.headers['content-type'] == 'application/json'
+    assert response.headers['etag'] == 'W/"1"'
@@ -1,6 +1,18 @@
 from http import HTTPStatus
 
-from fast_zero.security import create_access_token
+import pytest
+from freezegun import freeze_time
+from jwt import decode
+from sqlalchemy import select, update
+
+from fast_zero import security
+from fast_zero.models import User
+from fast_zero.routers import users
+from fast_zero.security import (
+    create_access_token,
+    principal_cache,
+    token_cache,
+)
 
 
 def test_jwt_invalid_token(client):
@@ -32,3 +44,249 @@ def test_get_current_does_not_exists(client):
     )
     assert response.status_code == HTTPStatus.UNAUTHORIZED
     assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_get_current_user_uses_principal_cache(client, token, count_queries):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/todos/', headers=headers)
+
+    with count_queries() as queries:
+        response = client.get('/todos/', headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert not any('FROM users' in sql for sql, _ in queries)
+    assert principal_cache.hits == 1
+    assert principal_cache.misses == 1
+
+
+def test_principal_cache_invalidated_on_update(client, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/todos/', headers=headers)
+
+    client.put(
+        f'/users/{user.id}',
+        headers=headers,
+        json={
+            'username': 'renamed',
+            'email': 'renamed@exemplo.com',
+            'password': 'secret',
+        },
+    )
+    response = client.get('/todos/', headers=headers)
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_principal_cache_survives_rolled_back_update(
+    isolated_client, user, other_user
+):
+    token = create_access_token({'sub': user.email})
+    headers = {'Authorization': f'Bearer {token}'}
+
+    response = isolated_client.put(
+        f'/users/{user.id}',
+        headers=headers,
+        json={
+            'username': other_user.username,
+            'email': user.email,
+            'password': 'secret',
+        },
+    )
+    refreshed = isolated_client.post('/auth/refresh_token', headers=headers)
+
+    assert response.status_code == HTTPStatus.CONFLICT
+    assert refreshed.status_code == HTTPStatus.OK
+
+
+@pytest.mark.asyncio
+async def test_token_version_bumped_from_the_stored_value(
+    isolated_client, session, engine, user, monkeypatch
+):
+    hash_password = users.get_password_hash_async
+
+    async def hash_while_another_worker_bumps(password):
+        # Lands after update_user loaded the row, before its UPDATE
+        async with engine.begin() as conn:
+            await conn.execute(
+                update(User).where(User.id == user.id).values(token_version=1)
+            )
+        return await hash_password(password)
+
+    monkeypatch.setattr(
+        users, 'get_password_hash_async', hash_while_another_worker_bumps
+    )
+    token = create_access_token({'sub': user.email})
+    isolated_client.put(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'username': user.username,
+            'email': user.email,
+            'password': 'new-secret',
+        },
+    )
+    version = await session.scalar(
+        select(User.token_version).where(User.id == user.id)
+    )
+
+    assert version == 1 + 1
+
+
+def test_principal_cache_not_refilled_by_lookup_racing_update(
+    client, user, token
+):
+    headers = {'Authorization': f'Bearer {token}'}
+    # A concurrent lookup read the old row before the update committed...
+    epoch = principal_cache.epoch
+
+    client.put(
+        f'/users/{user.id}',
+        headers=headers,
+        json={
+            'username': 'renamed',
+            'email': 'renamed@exemplo.com',
+            'password': 'secret',
+        },
+    )
+    # ...and tries to cache it once the update is done
+    principal_cache.set(user.email, user, epoch=epoch)
+    response = client.get('/todos/', headers=headers)
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_principal_cache_invalidated_on_delete(client, user, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    client.get('/todos/', headers=headers)
+
+    client.delete(f'/users/{user.id}', headers=headers)
+    response = client.get('/todos/', headers=headers)
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_verified_token_is_decoded_once(client, token, monkeypatch):
+    decode_calls = []
+
+    def counting_decode(*args, **kwargs):
+        decode_calls.append(args)
+        return decode(*args, **kwargs)
+
+    monkeypatch.setattr(security, 'decode', counting_decode)
+    headers = {'Authorization': f'Bearer {token}'}
+
+    client.get('/todos/', headers=headers)
+    response = client.get('/todos/', headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(decode_calls) == 1
+    assert token_cache.hits == 1
+
+
+def test_cached_token_expires_with_token(client, user):
+    with freeze_time('2025-01-01 12:00:00'):
+        token = create_access_token({'sub': user.email})
+        headers = {'Authorization': f'Bearer {token}'}
+
+        assert client.get('/todos/', headers=headers).status_code == (
+            HTTPStatus.OK
+        )
+
+        with freeze_time('2025-01-01 12:31:00'):
+            response = client.get('/todos/', headers=headers)
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert not token_cache
+
+
+@pytest.fixture
+def self_contained_token(client, user, monkeypatch):
+    monkeypatch.setattr(security.settings, 'ACCESS_TOKEN_SELF_CONTAINED', True)
+    response = client.post(
+        '/auth/token',
+        data={'username': user.email, 'password': user.clean_password},
+    )
+    return response.json()['access_token']
+
+
+def test_self_contained_token_claims(user, self_contained_token):
+    payload = security.decode_token(self_contained_token)
+
+    assert payload['sub'] == user.email
+    assert payload['uid'] == user.id
+    assert payload['ver'] == 0
+
+
+def test_todos_authorize_from_claims(
+    client, self_contained_token, count_queries
+):
+    headers = {'Authorization': f'Bearer {self_contained_token}'}
+    client.get('/todos/', headers=headers)
+
+    with count_queries() as queries:
+        response = client.get('/todos/', headers=headers)
+
+    assert response.status_code == HTTPStatus.OK
+    assert not any('FROM users' in sql for sql, _ in queries)
+    assert principal_cache.misses == 0
+
+
+def test_self_contained_token_revoked_on_update(
+    client, user, self_contained_token
+):
+    headers = {'Authorization': f'Bearer {self_contained_token}'}
+    client.get('/todos/', headers=headers)
+
+    client.put(
+        f'/users/{user.id}',
+        headers=headers,
+        json={
+            'username': user.username,
+            'email': user.email,
+            'password': 'new-secret',
+        },
+    )
+    response = client.get('/todos/', headers=headers)
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    assert response.json() == {'detail': 'Could not validate credentials'}
+
+
+def test_self_contained_token_revoked_when_read_races_update(
+    client, session, user, self_contained_token, monkeypatch
+):
+    headers = {'Authorization': f'Bearer {self_contained_token}'}
+    commit = session.commit
+
+    async def commit_after_concurrent_read():
+        # Another request checks the token between the bump and the commit
+        with session.no_autoflush:
+            await security._token_version(session, user.id)
+        await commit()
+
+    monkeypatch.setattr(session, 'commit', commit_after_concurrent_read)
+    client.put(
+        f'/users/{user.id}',
+        headers=headers,
+        json={
+            'username': user.username,
+            'email': user.email,
+            'password': 'new-secret',
+        },
+    )
+    monkeypatch.setattr(session, 'commit', commit)
+    response = client.get('/todos/', headers=headers)
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+
+
+def test_self_contained_token_rejected_after_delete(
+    client, user, self_contained_token
+):
+    headers = {'Authorization': f'Bearer {self_contained_token}'}
+
+    client.delete(f'/users/{user.id}', headers=headers)
+    response = client.get('/todos/', headers=headers)
+
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
@@ -1,9 +1,15 @@
+import csv
+import json
+from datetime import datetime, timedelta
 from http import HTTPStatus
+from io import StringIO
 
 import pytest
+from sqlalchemy import func, select, update
 from sqlalchemy.exc import DataError
 
 from fast_zero.models import Todo, TodoState
+from fast_zero.routers.todos import settings
 
 
 def test_create_todo(client, token, mock_db_time):
@@ -218,3 +224,507 @@ def test_delete_todo_error(client, token):
 
     assert response.status_code == HTTPStatus.NOT_FOUND
     assert response.json() == {'detail': 'Task not found'}
+
+
+@pytest.mark.asyncio
+async def test_list_todos_does_not_load_user_todos(  # noqa: PLR0913, PLR0917
+    session, client, user, token, todo, count_queries
+):
+    session.add_all(todo.create_batch(50, user_id=user.id))
+    await session.commit()
+
+    with count_queries() as queries:
+        response = client.get(
+            '/todos/?limit=1',
+            headers={'Authorization': f'Bearer {token}'},
+        )
+
+    expected_queries = 2  # principal and the page itself
+    rows_fetched = sum(rows for _, rows in queries)
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(queries) == expected_queries
+    assert rows_fetched == expected_queries
+
+
+@pytest.mark.asyncio
+async def test_list_todos_cursor_pagination(
+    session, client, user, token, todo
+):
+    session.add_all(todo.create_batch(5, user_id=user.id))
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    first_page = client.get('/todos/?limit=3', headers=headers).json()
+    second_page = client.get(
+        f'/todos/?limit=3&cursor={first_page["next_cursor"]}',
+        headers=headers,
+    ).json()
+
+    ids = [t['id'] for t in first_page['todos'] + second_page['todos']]
+
+    assert ids == [1, 2, 3, 4, 5]
+    assert second_page['next_cursor'] is None
+
+
+def test_list_todos_invalid_cursor(client, token):
+    response = client.get(
+        '/todos/?cursor=not-a-cursor',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_list_todos_filter_title_fulltext(  # noqa: PLR0913, PLR0917
+    session, client, user, token, todo, monkeypatch
+):
+    monkeypatch.setattr(settings, 'TODO_SEARCH_BACKEND', 'fulltext')
+    session.add(todo.create(user_id=user.id, title='Buy fresh milk'))
+    session.add(todo.create(user_id=user.id, title='Walk the dog'))
+    await session.commit()
+
+    response = client.get(
+        '/todos/?title=milk',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert [t['title'] for t in response.json()['todos']] == ['Buy fresh milk']
+
+
+def test_create_todos_bulk(client, token, count_queries):
+    todos = [
+        {'title': f'Todo {i}', 'description': 'bulk', 'state': 'todo'}
+        for i in range(3)
+    ]
+
+    with count_queries() as queries:
+        response = client.post(
+            '/todos/bulk',
+            headers={'Authorization': f'Bearer {token}'},
+            json={'todos': todos},
+        )
+
+    inserts = [sql for sql, _ in queries if sql.startswith('INSERT')]
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert [t['title'] for t in response.json()['todos']] == [
+        'Todo 0',
+        'Todo 1',
+        'Todo 2',
+    ]
+    assert len(inserts) == 1
+
+
+def test_create_todos_bulk_reports_invalid_items(client, token):
+    response = client.post(
+        '/todos/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={
+            'todos': [
+                {'title': 'ok', 'description': 'ok', 'state': 'todo'},
+                {'title': 'bad', 'description': 'bad', 'state': 'wrong'},
+            ]
+        },
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert response.json()['detail'][0]['loc'] == [
+        'body',
+        'todos',
+        1,
+        'state',
+    ]
+
+
+def test_create_todos_bulk_too_large(client, token, monkeypatch):
+    monkeypatch.setattr(settings, 'TODO_BULK_MAX_ITEMS', 1)
+    todo = {'title': 'title', 'description': 'desc', 'state': 'todo'}
+
+    response = client.post(
+        '/todos/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'todos': [todo, todo]},
+    )
+
+    assert response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+    assert response.json() == {'detail': 'At most 1 todos per request'}
+
+
+@pytest.mark.asyncio
+async def test_patch_todos_bulk(session, client, user, token, todo):
+    expected_todos = 3
+    session.add_all(
+        todo.create_batch(3, user_id=user.id, state=TodoState.done)
+    )
+    session.add(todo.create(user_id=user.id, state=TodoState.doing))
+    await session.commit()
+
+    response = client.patch(
+        '/todos/bulk?state=done',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'state': 'trash'},
+    )
+    trashed = client.get(
+        '/todos/?state=trash',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'count': expected_todos}
+    assert len(trashed.json()['todos']) == expected_todos
+
+
+@pytest.mark.asyncio
+async def test_delete_todos_bulk(  # noqa: PLR0913, PLR0917
+    session, client, user, other_user, token, todo
+):
+    expected_todos = 2
+    session.add_all(
+        todo.create_batch(2, user_id=user.id, state=TodoState.trash)
+    )
+    session.add(todo.create(user_id=user.id, state=TodoState.todo))
+    session.add(todo.create(user_id=other_user.id, state=TodoState.trash))
+    await session.commit()
+
+    response = client.delete(
+        '/todos/bulk?state=trash',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    remaining = await session.scalar(select(func.count()).select_from(Todo))
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json() == {'count': expected_todos}
+    assert remaining == expected_todos
+
+
+@pytest.mark.parametrize('method', ['PATCH', 'DELETE'])
+def test_bulk_without_filter_is_rejected(client, token, method):
+    response = client.request(
+        method,
+        '/todos/bulk',
+        headers={'Authorization': f'Bearer {token}'},
+        json={'state': 'trash'} if method == 'PATCH' else None,
+    )
+
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_delete_todos_bulk_all(session, client, user, token, todo):
+    session.add_all(todo.create_batch(2, user_id=user.id))
+    await session.commit()
+
+    response = client.delete(
+        '/todos/bulk?all=true',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    remaining = await session.scalar(select(func.count()).select_from(Todo))
+
+    assert response.status_code == HTTPStatus.OK
+    assert remaining == 0
+
+
+def test_create_todo_statements(client, token, count_queries):
+    with count_queries() as queries:
+        client.post(
+            '/todos/',
+            headers={'Authorization': f'Bearer {token}'},
+            json={'title': 'title', 'description': 'desc', 'state': 'todo'},
+        )
+
+    assert [sql.split()[0] for sql, _ in queries] == ['SELECT', 'INSERT']
+
+
+@pytest.mark.asyncio
+async def test_patch_todo_statements(  # noqa: PLR0913, PLR0917
+    session, client, user, token, todo, count_queries
+):
+    todo = todo.create(user_id=user.id)
+    session.add(todo)
+    await session.commit()
+
+    with count_queries() as queries:
+        response = client.patch(
+            f'/todos/{todo.id}',
+            json={'title': 'Test!!!'},
+            headers={'Authorization': f'Bearer {token}'},
+        )
+
+    assert response.json()['updated_at'] != todo.created_at.isoformat()
+    assert [sql.split()[0] for sql, _ in queries] == ['SELECT', 'UPDATE']
+
+
+@pytest.mark.asyncio
+async def test_delete_todo_statements(  # noqa: PLR0913, PLR0917
+    session, client, user, token, todo, count_queries
+):
+    todo = todo.create(user_id=user.id)
+    session.add(todo)
+    await session.commit()
+
+    with count_queries() as queries:
+        client.delete(
+            f'/todos/{todo.id}', headers={'Authorization': f'Bearer {token}'}
+        )
+
+    assert [sql.split()[0] for sql, _ in queries] == [
+        'SELECT',
+        'DELETE',
+        'INSERT',  # tombstone for /todos/changes
+    ]
+
+
+@pytest.mark.asyncio
+async def test_patch_todo_of_other_user(
+    session, client, other_user, token, todo
+):
+    todo = todo.create(user_id=other_user.id)
+    session.add(todo)
+    await session.commit()
+
+    response = client.patch(
+        f'/todos/{todo.id}',
+        json={'title': 'Test!!!'},
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_list_todos_not_modified(session, client, user, token, todo):
+    session.add_all(todo.create_batch(2, user_id=user.id))
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    response = client.get('/todos/', headers=headers)
+    etag = response.headers['ETag']
+    cached = client.get('/todos/', headers={**headers, 'If-None-Match': etag})
+
+    assert cached.status_code == HTTPStatus.NOT_MODIFIED
+    assert cached.headers['ETag'] == etag
+    assert not cached.content
+
+
+@pytest.mark.asyncio
+async def test_list_todos_etag_changes_on_write(
+    session, client, user, token, todo
+):
+    session.add(todo.create(user_id=user.id))
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    etag = client.get('/todos/', headers=headers).headers['ETag']
+    client.post(
+        '/todos/',
+        headers=headers,
+        json={'title': 'title', 'description': 'desc', 'state': 'todo'},
+    )
+    response = client.get(
+        '/todos/', headers={**headers, 'If-None-Match': etag}
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['ETag'] != etag
+
+
+@pytest.mark.asyncio
+async def test_list_todo_changes(  # noqa: PLR0913, PLR0917
+    session, client, user, token, todo, monkeypatch
+):
+    monkeypatch.setattr(settings, 'TODO_CHANGES_OVERLAP_SECONDS', 0)
+    kept, updated, removed = todo.create_batch(3, user_id=user.id)
+    session.add_all([kept, updated, removed])
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    full_sync = client.get('/todos/changes', headers=headers).json()
+    client.patch(
+        f'/todos/{updated.id}', headers=headers, json={'title': 'changed'}
+    )
+    client.delete(f'/todos/{removed.id}', headers=headers)
+    delta = client.get(
+        '/todos/changes',
+        headers=headers,
+        params={'since': full_sync['cursor']},
+    ).json()
+
+    assert len(full_sync['todos']) == len([kept, updated, removed])
+    assert full_sync['deleted'] == []
+    assert [t['title'] for t in delta['todos']] == ['changed']
+    assert delta['deleted'] == [removed.id]
+    assert delta['cursor'] > full_sync['cursor']
+
+
+@pytest.mark.asyncio
+async def test_list_todo_changes_accepts_aware_cursor(
+    session, client, user, token, todo
+):
+    session.add(todo.create(user_id=user.id))
+    await session.commit()
+
+    response = client.get(
+        '/todos/changes',
+        headers={'Authorization': f'Bearer {token}'},
+        params={'since': '2020-01-01T00:00:00+03:00'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.json()['todos']) == 1
+
+
+@pytest.mark.asyncio
+async def test_list_todo_changes_resends_late_commits(
+    session, client, user, token, todo
+):
+    synced, late = todo.create_batch(2, user_id=user.id)
+    session.add_all([synced, late])
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+    cursor = datetime.fromisoformat(
+        client.get('/todos/changes', headers=headers).json()['cursor']
+    )
+
+    # A write stamped before the cursor but committed after the sync
+    await session.execute(
+        update(Todo)
+        .where(Todo.id == late.id)
+        .values(title='late', updated_at=cursor - timedelta(seconds=1))
+    )
+    await session.commit()
+    delta = client.get(
+        '/todos/changes',
+        headers=headers,
+        params={'since': f'{cursor.isoformat()}Z'},
+    ).json()
+
+    assert 'late' in [t['title'] for t in delta['todos']]
+
+
+@pytest.mark.asyncio
+async def test_export_todos_ndjson(  # noqa: PLR0913, PLR0917
+    session, client, user, token, todo, monkeypatch
+):
+    monkeypatch.setattr(settings, 'TODO_EXPORT_CHUNK_SIZE', 2)
+    session.add_all(todo.create_batch(3, user_id=user.id))
+    await session.commit()
+
+    response = client.get(
+        '/todos/export', headers={'Authorization': f'Bearer {token}'}
+    )
+    lines = [json.loads(line) for line in response.text.splitlines()]
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert [line['id'] for line in lines] == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_export_todos_csv(session, client, user, token, todo):
+    session.add_all(todo.create_batch(3, user_id=user.id))
+    await session.commit()
+
+    response = client.get(
+        '/todos/export?format=csv',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+    rows = list(csv.DictReader(StringIO(response.text)))
+
+    assert response.headers['content-type'].startswith('text/csv')
+    assert [row['id'] for row in rows] == ['1', '2', '3']
+    assert rows[0]['state'] in TodoState.__members__
+
+
+def test_import_todos_ndjson(client, token, monkeypatch):
+    expected_imported = 2
+    bad_line = 2
+    monkeypatch.setattr(settings, 'TODO_IMPORT_CHUNK_SIZE', 2)
+    lines = [
+        {'title': 'a', 'description': 'a', 'state': 'todo'},
+        {'title': 'b', 'description': 'b', 'state': 'wrong'},
+        {'title': 'c', 'description': 'c', 'state': 'done'},
+    ]
+    body = '\n'.join(json.dumps(line) for line in lines)
+    headers = {
+        'Authorization': f'Bearer {token}',
+        'Content-Type': 'application/x-ndjson',
+    }
+
+    response = client.post('/todos/import', headers=headers, content=body)
+    report = response.json()
+    todos = client.get('/todos/', headers=headers).json()['todos']
+
+    assert response.status_code == HTTPStatus.OK
+    assert report['imported'] == expected_imported
+    assert report['failed'] == 1
+    assert [chunk['imported'] for chunk in report['chunks']] == [1, 1]
+    assert report['chunks'][0]['errors'][0]['line'] == bad_line
+    assert [todo['title'] for todo in todos] == ['a', 'c']
+
+
+def test_import_todos_csv(client, token):
+    expected_imported = 2
+    body = 'title,description,state\nfirst,desc,todo\nsecond,desc,doing\n'
+    headers = {'Authorization': f'Bearer {token}', 'Content-Type': 'text/csv'}
+
+    response = client.post('/todos/import', headers=headers, content=body)
+
+    assert response.json()['imported'] == expected_imported
+    assert response.json()['failed'] == 0
+
+
+@pytest.mark.asyncio
+async def test_csv_export_import_round_trip(session, client, user, token):
+    expected_imported = 3
+    session.add_all([
+        Todo(
+            title=f'todo {n}',
+            description=f'line\n"quoted" {n}',
+            state=TodoState.todo,
+            user_id=user.id,
+        )
+        for n in range(expected_imported)
+    ])
+    await session.commit()
+    headers = {'Authorization': f'Bearer {token}'}
+
+    exported = client.get('/todos/export?format=csv', headers=headers)
+    response = client.post(
+        '/todos/import',
+        headers={**headers, 'Content-Type': 'text/csv'},
+        content=exported.content,
+    )
+    todos = client.get('/todos/?limit=100', headers=headers).json()['todos']
+
+    assert response.json()['imported'] == expected_imported
+    assert response.json()['failed'] == 0
+    assert [todo['description'] for todo in todos[expected_imported:]] == [
+        f'line\n"quoted" {n}' for n in range(expected_imported)
+    ]
+
+
+def test_import_todos_unsupported_media_type(client, token):
+    response = client.post(
+        '/todos/import',
+        headers={'Authorization': f'Bearer {token}'},
+        json=[],
+    )
+
+    assert response.status_code == HTTPStatus.UNSUPPORTED_MEDIA_TYPE
+
+
+@pytest.mark.asyncio
+async def test_list_todos_does_not_hydrate_entities(
+    session, client, user, token, todo
+):
+    session.add_all(todo.create_batch(2, user_id=user.id))
+    await session.commit()
+    session.expunge_all()
+
+    client.get('/todos/', headers={'Authorization': f'Bearer {token}'})
+
+    assert not any(
+        isinstance(obj, Todo) for obj in session.identity_map.values()
+    )
@@ -1,5 +1,9 @@
 from http import HTTPStatus
 
+import pytest
+from sqlalchemy import func, select
+
+from fast_zero.models import Todo
 from fast_zero.schemas import UserPublic
 
 
@@ -52,7 +56,7 @@ def test_read_users(client):
     response = client.get('/users/')
 
     assert response.status_code == HTTPStatus.OK
-    assert response.json() == {'users': []}
+    assert response.json() == {'users': [], 'next_cursor': None}
 
 
 def test_read_users_with_users(client, user):
@@ -60,7 +64,10 @@ def test_read_users_with_users(client, user):
     response = client.get('/users/')
 
     assert response.status_code == HTTPStatus.OK
-    assert response.json() == {'users': [user_schema]}
+    assert response.json() == {
+        'users': [user_schema],
+        'next_cursor': None,
+    }
 
 
 def test_get_one_user(client, user):
@@ -145,3 +152,74 @@ def test_delete_user_exception(client, token, other_user):
     )
     assert response.status_code == HTTPStatus.FORBIDDEN
     assert response.json() == {'detail': 'Not enough permissions'}
+
+
+@pytest.mark.asyncio
+async def test_delete_user_with_todos(session, client, user, token, todo):
+    session.add_all(todo.create_batch(3, user_id=user.id))
+    await session.commit()
+    session.expire(user, ['todos'])
+
+    response = client.delete(
+        f'/users/{user.id}',
+        headers={'Authorization': f'Bearer {token}'},
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    assert await session.scalar(select(func.count()).select_from(Todo)) == 0
+
+
+def test_create_user_statements(client, count_queries):
+    with count_queries() as queries:
+        client.post(
+            '/users/',
+            json={
+                'username': 'lucas',
+                'email': 'lucas@exemplo.com',
+                'password': 'secret',
+            },
+        )
+
+    assert [sql.split()[0] for sql, _ in queries] == ['SELECT', 'INSERT']
+
+
+def test_update_user_statements(client, user, token, count_queries):
+    with count_queries() as queries:
+        client.put(
+            f'/users/{user.id}',
+            headers={'Authorization': f'Bearer {token}'},
+            json={
+                'username': 'henrique',
+                'email': 'henrique@exemplo.com',
+                'password': 'secret',
+            },
+        )
+
+    assert [sql.split()[0] for sql, _ in queries] == ['SELECT', 'UPDATE']
+
+
+def test_get_one_user_not_modified(client, user):
+    etag = client.get(f'/users/{user.id}').headers['ETag']
+
+    response = client.get(f'/users/{user.id}', headers={'If-None-Match': etag})
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_read_users_not_modified(client, user):
+    etag = client.get('/users/').headers['ETag']
+
+    response = client.get('/users/', headers={'If-None-Match': etag})
+    other_page = client.get('/users/?limit=1', headers={'If-None-Match': etag})
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert other_page.status_code == HTTPStatus.OK
+
+
+def test_read_users_selects_public_columns(client, user, count_queries):
+    with count_queries() as queries:
+        client.get('/users/')
+        client.get(f'/users/{user.id}')
+
+    assert not any('password' in sql for sql, _ in queries)
+    assert not any('FROM todos' in sql for sql, _ in queries)